@@ -7,22 +7,35 @@ class CustomCredentials(Credentials):
         super().__init__()
         self.token = token
         self.sa_credentials = service_account_credentials
+
+    @property
+    def token(self):
+        return self._token
+
+    @token.setter
+    def token(self, value):
+        # Build the header once per token instead of on every request
+        self._token = value
+        self._auth_header = f'Bearer {value}' if value else None
         
     def apply(self, headers):
-        if self.token:
-            headers['Authorization'] = f'Bearer {self.token}'
+        if self._auth_header:
+            headers['Authorization'] = self._auth_header
         elif self.sa_credentials:
             # Let the service account credentials handle authorization
             self.sa_credentials.apply(headers)
         
     def before_request(self, request, method, url, headers):
+        # Only mint a new service account token when the current one is missing or expired
+        if self.sa_credentials and not self.sa_credentials.valid:
+            self.refresh(request)
         self.apply(headers)
         
     def refresh(self, request):
         if self.sa_credentials:
             self.sa_credentials.refresh(request)
+            self.expiry = self.sa_credentials.expiry
         # Token-based credentials don't need refresh
-        pass
 
     @property
     def service_account_email(self):
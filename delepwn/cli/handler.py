@@ -1,16 +1,11 @@
 import os
 import sys
-import csv
+import copy
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from delepwn.core.enumerator import ServiceAccountEnumerator
-from delepwn.core.delegator import check, test_service_account_key
-from delepwn.utils.output import print_color
-from delepwn.services.drive import DriveManager
-from delepwn.services.calendar import CalendarManager
-from delepwn.services.admin import AdminManager
-from delepwn.auth.credentials import CustomCredentials
-from google.oauth2 import service_account
-from delepwn.services.gmail import GmailManager
+from delepwn.utils.output import print_color, colorizer
+from delepwn.utils.dates import parse_date
+from delepwn.config.settings import MAX_IMPERSONATION_WORKERS
 
 
 class CommandHandler:
@@ -19,6 +14,12 @@ class CommandHandler:
     @staticmethod
     def handle_enum_command(args):
         """Handle enumeration commands"""
+        # Imported here so other commands don't pay for the enumeration modules
+        from google.oauth2 import service_account
+        from delepwn.auth.credentials import CustomCredentials
+        from delepwn.core.enumerator import ServiceAccountEnumerator
+        from delepwn.core.delegator import check, test_service_account_key
+
         # Check for list-projects first
         if args.list_projects:
             try:
@@ -41,17 +42,7 @@ class CommandHandler:
 
                 enumerator = ServiceAccountEnumerator(credentials, verbose=args.verbose, project_id=args.project, current_email=args.current_email)
                 
-                print_color("\n→ Listing accessible GCP projects:\n", color="cyan")
-                projects = enumerator.list_projects()
-                for project in projects:
-                    print_color(f"Project ID: {project['projectId']}", color="white")
-                    print_color(f"Project Name: {project['name']}", color="cyan")
-                    print(f"Project Number: {project['projectNumber']}")
-                    roles = project.get('roles', [])
-                    print_color(f"  Your Roles: {', '.join(roles)}", color="yellow")
-                    print_color(f"  Key Creation Perms: {'✓' if any(enumerator.check_permission(r) for r in roles) else '✗'}", 
-                                color="green" if any(enumerator.check_permission(r) for r in roles) else "red")
-                    print("---")
+                CommandHandler._print_projects(enumerator)
                 sys.exit(0)
             except Exception as e:
                 print_color(f"An error occurred while listing projects: {str(e)}", color="red")
@@ -92,20 +83,6 @@ class CommandHandler:
             enumerator = ServiceAccountEnumerator(credentials, verbose=args.verbose, project_id=args.project, current_email=args.current_email)
             #enumerator.check_access = args.check_access
             
-            if args.list_projects:
-                print_color("\n→ Listing accessible GCP projects:\n", color="cyan")
-                projects = enumerator.list_projects()
-                for project in projects:
-                    print_color(f"Project ID: {project['projectId']}", color="white")
-                    print_color(f"Project Name: {project['name']}", color="cyan")
-                    print(f"Project Number: {project['projectNumber']}")
-                    roles = project.get('roles', [])
-                    print_color(f"  Your Roles: {', '.join(roles)}", color="yellow")
-                    print_color(f"  Key Creation Perms: {'✓' if any(enumerator.check_permission(r) for r in roles) else '✗'}", 
-                                color="green" if any(enumerator.check_permission(r) for r in roles) else "red")
-                    print("---")
-                sys.exit(0)
-            
             if enumerator.user_email is None:
                 raise Exception(print_color("[-] Error verifying token. Ensure it's refreshed.", color="red"))
             
@@ -115,16 +92,42 @@ class CommandHandler:
             print_color(f"An error occurred: {e}", color="red")
             raise
 
+    @staticmethod
+    def _print_projects(enumerator):
+        """Print accessible GCP projects with the caller's roles as they are enumerated"""
+        white, cyan, yellow, green, red = (colorizer(c) for c in ('white', 'cyan', 'yellow', 'green', 'red'))
+        print_color("\n→ Listing accessible GCP projects:\n", color="cyan")
+        for project in enumerator.iter_projects():
+            roles = project.get('roles', [])
+            # ✓ means one of the caller's bound roles grants key creation, role lookups are cached
+            has_perm = any(enumerator.check_permission(role) for role in roles)
+            perms = green('  Key Creation Perms: ✓') if has_perm else red('  Key Creation Perms: ✗')
+            # One write per project instead of one print per line
+            sys.stdout.write(
+                white(f"Project ID: {project['projectId']}") + "\n"
+                + cyan(f"Project Name: {project['name']}") + "\n"
+                + f"Project Number: {project['projectNumber']}\n"
+                + yellow(f"  Your Roles: {', '.join(roles)}") + "\n"
+                + perms + "\n---\n"
+            )
+        sys.stdout.flush()
+
     @staticmethod
     def handle_drive_command(args):
         """Handle drive-related commands"""
+        from delepwn.services.drive import DriveManager
+
         try:
             drive_manager = DriveManager(service_account_file=args.key_file)
             access_token = drive_manager.get_access_token(args.impersonate)
             drive_manager.initialize_service(access_token)
             
             if args.download:
-                drive_manager.download_file(args.download)
+                file_ids = CommandHandler._split_ids(args.download)
+                if len(file_ids) > 1:
+                    drive_manager.download_files(file_ids)
+                else:
+                    drive_manager.download_file(file_ids[0])
             elif args.list:
                 CommandHandler._handle_drive_list(drive_manager, args)
             elif args.sharefolders:
@@ -137,11 +140,13 @@ class CommandHandler:
     @staticmethod
     def _handle_drive_list(drive_manager, args):
         """Handle drive list subcommand"""
-        if args.output:
-            with open(args.output, mode='w', newline='') as csv_file:
-                writer = csv.writer(csv_file)
-                writer.writerow(['File', 'ID', 'Size', 'Trashed', 'Extension'])
-        drive_manager.list_files(args.output, args.folder)
+        folder_ids = CommandHandler._split_ids(args.folder) if args.folder else None
+        if not args.output:
+            drive_manager.list_files(folder_id=folder_ids)
+            return
+
+        with drive_manager.open_csv(args.output, header=['File', 'ID', 'Size', 'Trashed', 'Extension']) as writer:
+            drive_manager.list_files(writer=writer, folder_id=folder_ids)
 
     @staticmethod
     def _handle_drive_share(drive_manager, args):
@@ -160,44 +165,109 @@ class CommandHandler:
     @staticmethod
     def handle_calendar_command(args):
         """Handle calendar-related commands"""
+        from delepwn.services.calendar import CalendarManager
+
         try:
             if args.list and not (args.start_date and args.end_date):
                 raise ValueError("--list requires both --start-date and --end-date")
+
+            emails = CommandHandler._split_ids(args.impersonate)
+            if len(emails) > 1:
+                if not args.list:
+                    raise ValueError("Multiple users to impersonate are only supported with --list")
+                CommandHandler._handle_calendar_list_many(emails, args)
+                return
                 
             calendar_manager = CalendarManager(service_account_file=args.key_file)
-            calendar_manager.initialize_service(args.impersonate)
+            calendar_manager.initialize_service(emails[0])
 
             if args.list:
                 CommandHandler._handle_calendar_list(calendar_manager, args)
             elif args.details:
-                calendar_manager.get_event_details(args.details)
+                event_ids = CommandHandler._split_ids(args.details)
+                if len(event_ids) > 1:
+                    calendar_manager.batch_get_details(event_ids)
+                else:
+                    calendar_manager.get_event_details(event_ids[0])
             elif args.create:
                 calendar_manager.create_phishing_event(args.create)
             elif args.delete:
-                calendar_manager.delete_event(args.delete)
+                event_ids = CommandHandler._split_ids(args.delete)
+                if len(event_ids) > 1:
+                    calendar_manager.batch_delete_events(event_ids)
+                else:
+                    calendar_manager.delete_event(event_ids[0])
                 
         except Exception as e:
             print_color(f"An error occurred: {str(e)}", color="red")
             raise
 
     @staticmethod
-    def _handle_calendar_list(calendar_manager, args):
-        """Handle calendar list subcommand"""
+    def _split_ids(value):
+        """Split a comma-separated list of IDs, dropping repeats and keeping the given order"""
+        ids = list(dict.fromkeys(item.strip() for item in value.split(',') if item.strip()))
+        if not ids:
+            raise ValueError("At least one ID is required")
+        return ids
+
+    @staticmethod
+    def _parse_calendar_dates(args):
+        """Parse the --start-date/--end-date arguments of the calendar command
+        
+        Only plain YYYY-MM-DD dates are accepted, the calendar API is queried in UTC
+        and times or UTC offsets would produce an invalid range.
+        """
         try:
-            start_date = datetime.strptime(args.start_date, '%Y-%m-%d') if args.start_date else datetime.now()
-            end_date = datetime.strptime(args.end_date, '%Y-%m-%d') if args.end_date else start_date + timedelta(days=7)
+            start_date = parse_date(args.start_date) if args.start_date else datetime.now()
+            end_date = parse_date(args.end_date) if args.end_date else start_date + timedelta(days=7)
         except ValueError:
             print_color("Invalid date format. Please use YYYY-MM-DD", color="red")
             sys.exit(1)
-            
-        calendar_manager.list_events(start_date, end_date)
+        return start_date, end_date
+
+    @staticmethod
+    def _handle_calendar_list(calendar_manager, args):
+        """Handle calendar list subcommand"""
+        start_date, end_date = CommandHandler._parse_calendar_dates(args)
+        calendar_manager.list_events(start_date, end_date,
+                                     ordered=not args.unordered,
+                                     expand_recurring=not args.unordered)
+
+    @staticmethod
+    def _handle_calendar_list_many(emails, args):
+        """List calendar events for several impersonated users concurrently"""
+        from delepwn.services.calendar import CalendarManager
+
+        start_date, end_date = CommandHandler._parse_calendar_dates(args)
+        template = CalendarManager(service_account_file=args.key_file)
+
+        def fetch(email):
+            # Each user gets its own service and cache, the parsed key is shared
+            calendar_manager = copy.copy(template)
+            calendar_manager._services = {}
+            try:
+                calendar_manager.initialize_service(email)
+                events = calendar_manager.get_events(start_date, end_date,
+                                                     ordered=not args.unordered,
+                                                     expand_recurring=not args.unordered)
+                return email, calendar_manager, events, None
+            except Exception as e:
+                return email, calendar_manager, None, e
+
+        with ThreadPoolExecutor(max_workers=min(MAX_IMPERSONATION_WORKERS, len(emails))) as executor:
+            for email, calendar_manager, events, error in executor.map(fetch, emails):
+                print_color(f"\n=== Calendar of {email} ===", color="cyan")
+                if error is not None:
+                    print_color(f"Error listing events: {error}", color="red")
+                    continue
+                calendar_manager.print_events(events)
 
     @staticmethod
     def handle_admin_command(args):
         """Handle admin commands for user privilege elevation"""
+        from delepwn.services.admin import AdminManager
+
         try:
-            from src.managers.admin_manager import AdminManager
-            
             admin_manager = AdminManager(service_account_file=args.key_file)
             admin_manager.initialize_service(args.impersonate)
             
@@ -222,6 +292,8 @@ class CommandHandler:
     @staticmethod
     def handle_gmail_command(args):
         """Handle Gmail-related commands"""
+        from delepwn.services.gmail import GmailManager
+
         try:
             gmail_manager = GmailManager(service_account_file=args.key_file)
             gmail_manager.initialize_service(args.impersonate)
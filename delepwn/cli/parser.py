@@ -1,25 +1,60 @@
 # argument_parser.py
+import os
+import sys
 import argparse
 
+
+class EnvDefault(argparse.Action):
+    """Store action that falls back to an environment variable
+
+    The option is only required when the environment variable is not set.
+    """
+
+    def __init__(self, envvar, required=True, default=None, **kwargs):
+        if envvar in os.environ:
+            default = os.environ[envvar]
+            required = False
+        super().__init__(default=default, required=required, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values)
+
 class ArgumentParser:
     """Handles command line argument parsing"""
     
     @staticmethod
-    def setup_parsers():
-        """Set up all command line argument parsers
+    def setup_parsers(argv=None):
+        """Set up command line argument parsers
+        
+        Only the subparser of the requested command is built; the full
+        command tree is built for --help, no arguments or an unknown command.
         
+        Args:
+            argv (list, optional): Arguments to inspect. Defaults to sys.argv[1:]
+            
         Returns:
             argparse.ArgumentParser: Configured argument parser
         """
+        if argv is None:
+            argv = sys.argv[1:]
+
         parser = argparse.ArgumentParser(description='Exploit Domain-Wide Delegation in GCP')
         subparsers = parser.add_subparsers(dest='command', help='Available commands')
         subparsers.required = True
 
-        ArgumentParser._setup_enum_parser(subparsers)
-        ArgumentParser._setup_drive_parser(subparsers)
-        ArgumentParser._setup_calendar_parser(subparsers)
-        ArgumentParser._setup_admin_parser(subparsers)
-        ArgumentParser._setup_gmail_parser(subparsers)
+        setups = {
+            'enum': ArgumentParser._setup_enum_parser,
+            'drive': ArgumentParser._setup_drive_parser,
+            'calendar': ArgumentParser._setup_calendar_parser,
+            'admin': ArgumentParser._setup_admin_parser,
+            'gmail': ArgumentParser._setup_gmail_parser,
+        }
+        command = argv[0] if argv else None
+        if command in setups:
+            setups[command](subparsers)
+        else:
+            for setup in setups.values():
+                setup(subparsers)
 
         return parser
 
@@ -50,21 +85,21 @@ class ArgumentParser:
             help='Impersonate a user and perform actions on Google Drive.')
         
         # Required arguments
-        drive_parser.add_argument('--key-file', type=str, required=True,
-            help='Path to service account JSON key file')
-        drive_parser.add_argument('--impersonate', type=str, required=True,
-            help='User to impersonate')
+        drive_parser.add_argument('--key-file', type=str, action=EnvDefault, envvar='DELEPWN_KEY_FILE',
+            help='Path to service account JSON key file (env: DELEPWN_KEY_FILE)')
+        drive_parser.add_argument('--impersonate', type=str, action=EnvDefault, envvar='DELEPWN_IMPERSONATE',
+            help='User to impersonate (env: DELEPWN_IMPERSONATE)')
             
         # Optional arguments
         drive_parser.add_argument('--output', type=str,
             help='Output CSV file for file listing')
         drive_parser.add_argument('--folder', type=str,
-            help='List files in specific folder')
+            help='List files in specific folder (comma-separate IDs to list several in one batch)')
             
         # Mutually exclusive command group
         group = drive_parser.add_mutually_exclusive_group(required=True)
         group.add_argument('--download', type=str, metavar='FILE_ID',
-            help='Download a file from Google Drive')
+            help='Download a file from Google Drive (comma-separate IDs to download several in parallel)')
         group.add_argument('--list', action='store_true',
             help='List all contents of Google Drive')
         group.add_argument('--sharefolders', type=str, metavar='TARGET_EMAIL',
@@ -77,19 +112,19 @@ class ArgumentParser:
             help='Impersonate a user and perform actions on Google Calendar.')
             
         # Required arguments
-        calendar_parser.add_argument('--key-file', type=str, required=True,
-            help='Path to service account JSON key file')
-        calendar_parser.add_argument('--impersonate', type=str, required=True,
-            help='User to impersonate')
+        calendar_parser.add_argument('--key-file', type=str, action=EnvDefault, envvar='DELEPWN_KEY_FILE',
+            help='Path to service account JSON key file (env: DELEPWN_KEY_FILE)')
+        calendar_parser.add_argument('--impersonate', type=str, action=EnvDefault, envvar='DELEPWN_IMPERSONATE',
+            help='User to impersonate (comma-separate several users with --list; env: DELEPWN_IMPERSONATE)')
         
         # Mutually exclusive command group
         calendar_group = calendar_parser.add_mutually_exclusive_group(required=True)
         calendar_group.add_argument('--list', action='store_true',
             help='List calendar events (requires --start-date and --end-date)')
         calendar_group.add_argument('--details', type=str, metavar='EVENT_ID',
-            help='Get detailed information about a specific event')
+            help='Get detailed information about an event (comma-separate IDs for several)')
         calendar_group.add_argument('--delete', type=str, metavar='EVENT_ID',
-            help='Delete a calendar event')
+            help='Delete a calendar event (comma-separate IDs for several)')
         calendar_group.add_argument('--create', type=str, metavar='CONFIG_FILE',
             help='Create event using YAML configuration file')
         
@@ -99,6 +134,8 @@ class ArgumentParser:
             help='Start date for listing events (YYYY-MM-DD format)')
         date_group.add_argument('--end-date', type=str,
             help='End date for listing events (YYYY-MM-DD format)')
+        calendar_parser.add_argument('--unordered', action='store_true', default=False,
+            help='List events unsorted and recurring series as a single entry (faster on large calendars)')
 
         # Custom validation to require both dates when using --list
         def validate_args(args):
@@ -116,10 +153,10 @@ class ArgumentParser:
             help='Manage Google Workspace admin privileges.')
             
         # Required arguments
-        admin_parser.add_argument('--key-file', type=str, required=True,
-            help='Path to service account JSON key file')
-        admin_parser.add_argument('--impersonate', type=str, required=True,
-            help='User to impersonate (must have admin privileges)')
+        admin_parser.add_argument('--key-file', type=str, action=EnvDefault, envvar='DELEPWN_KEY_FILE',
+            help='Path to service account JSON key file (env: DELEPWN_KEY_FILE)')
+        admin_parser.add_argument('--impersonate', type=str, action=EnvDefault, envvar='DELEPWN_IMPERSONATE',
+            help='User to impersonate (must have admin privileges; env: DELEPWN_IMPERSONATE)')
             
         # Action group (mutually exclusive)
         action_group = admin_parser.add_mutually_exclusive_group(required=True)
@@ -133,10 +170,10 @@ class ArgumentParser:
         """Set up gmail command parser"""
         parser_gmail = subparsers.add_parser('gmail',
             help='Access Gmail through DWD')
-        parser_gmail.add_argument('--key-file', required=True,
-            help='Path to service account JSON key file')
-        parser_gmail.add_argument('--impersonate', required=True,
-            help='Email address to impersonate')
+        parser_gmail.add_argument('--key-file', action=EnvDefault, envvar='DELEPWN_KEY_FILE',
+            help='Path to service account JSON key file (env: DELEPWN_KEY_FILE)')
+        parser_gmail.add_argument('--impersonate', action=EnvDefault, envvar='DELEPWN_IMPERSONATE',
+            help='Email address to impersonate (env: DELEPWN_IMPERSONATE)')
         parser_gmail.add_argument('--list', action='store_true',
             help='List emails in the inbox')
         parser_gmail.add_argument('--max-results', type=int, default=100,
@@ -1,10 +1,12 @@
 """Global configuration settings"""
 
 import os
+import functools
 from pathlib import Path
 
-# Get the project root directory (parent of delepwn folder)
-PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Resolved once: this module's directory and the project root (parent of delepwn folder)
+CONFIG_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = str(CONFIG_DIR.parents[1])
 
 # Base paths
 KEYS_DIR = os.path.join(PROJECT_ROOT, "SA_private_keys")
@@ -12,12 +14,19 @@ RESULTS_DIR = os.path.join(PROJECT_ROOT, "results")
 DOWNLOADS_DIR = os.path.join(PROJECT_ROOT, "downloads")
 EXAMPLES_DIR = os.path.join(PROJECT_ROOT, "examples")
 
-# OAuth scopes file
-OAUTH_SCOPES_FILE = 'delepwn/config/oauth_scopes.txt'
+# OAuth scopes file, shipped next to this module
+OAUTH_SCOPES_FILE = str(CONFIG_DIR / "oauth_scopes.txt")
 
-# Ensure required directories exist
-for directory in [KEYS_DIR, RESULTS_DIR, DOWNLOADS_DIR]:
-    os.makedirs(directory, exist_ok=True)
+
+@functools.lru_cache(maxsize=None)
+def ensure_dir(path):
+    """Create a directory on first use and return its path
+
+    Directories are created by the code that writes to them, not at import
+    time; repeated calls for the same path are no-ops.
+    """
+    os.makedirs(path, exist_ok=True)
+    return path
 
 # Service settings
 DRIVE_API_VERSION = "v3"
@@ -35,7 +44,12 @@ GCP_TOKEN_ENV_VAR = "GCP_BEARER_ACCESS_TOKEN"
 # Rate limiting settings
 MAX_API_RETRIES = 5
 RATE_LIMIT_BACKOFF_FACTOR = 2
-API_RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+API_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 403 reasons Google uses for quota throttling, retried like 429
+RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded", "sharingRateLimitExceeded"})
+# Client-side cap on rate-limited API calls per second, override with DELEPWN_API_QPS
+_api_qps = os.environ.get("DELEPWN_API_QPS", "")
+API_RATE_LIMIT_QPS = int(_api_qps) if _api_qps.isdigit() and int(_api_qps) > 0 else 10
 
 # File paths
 SERVICE_ACCOUNT_KEY_FOLDER = KEYS_DIR
@@ -45,5 +59,18 @@ RESULTS_FOLDER = RESULTS_DIR
 API_RETRY_COUNT = 3
 API_RETRY_DELAY = 1  # seconds
 
+# Concurrency settings
+MAX_IMPERSONATION_WORKERS = 32  # users queried in parallel
+SCOPE_TEST_WORKERS = 16  # concurrent token exchanges when testing a single key file
+# Concurrent DWD token exchanges during enumeration, override with DELEPWN_TOKEN_WORKERS
+_token_workers = os.environ.get("DELEPWN_TOKEN_WORKERS", "")
+TOKEN_VALIDATION_WORKERS = int(_token_workers) if _token_workers.isdigit() and int(_token_workers) > 0 else 32
+
+# Download settings
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # bytes per ranged request of a Drive download
+DOWNLOAD_PROGRESS_STEP = 32 * 1024 * 1024  # bytes downloaded between progress lines
+DOWNLOAD_WORKERS = 4  # files downloaded in parallel
+DOWNLOAD_RANGE_WORKERS = 8  # byte ranges of one file fetched in parallel
+
 # Default timeouts
 DEFAULT_REQUEST_TIMEOUT = 30  # seconds
\ No newline at end of file
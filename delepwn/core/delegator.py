@@ -1,22 +1,19 @@
 import sys
-import yaml
-import argparse
-from google.auth.credentials import Credentials
-from delepwn.core.enumerator import ServiceAccountEnumerator
-from googleapiclient.errors import HttpError
-from google.auth.exceptions import RefreshError
-from delepwn.core.oauth_enumerator import OAuthEnumerator
-from delepwn.core.domain_users import DomainUserEnumerator
 import os
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from google.auth.transport.requests import Request
+from delepwn.core.enumerator import ServiceAccountEnumerator
+from delepwn.core.oauth_enumerator import OAuthEnumerator
+from delepwn.core.domain_users import DomainUserEnumerator
 from delepwn.utils.output import print_color
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from delepwn.config.settings import SERVICE_ACCOUNT_KEY_FOLDER
+from delepwn.config.settings import SERVICE_ACCOUNT_KEY_FOLDER, OAUTH_SCOPES_FILE, SCOPE_TEST_WORKERS, RESULTS_DIR, ensure_dir
 
 
-SCOPES_FILE = 'delepwn/config/oauth_scopes.txt'  # Updated path
+SCOPES_FILE = OAUTH_SCOPES_FILE
 
 
 def results(oauth_enumerator):
@@ -26,8 +23,7 @@ def results(oauth_enumerator):
         oauth_enumerator: The OAuthEnumerator instance containing results
     """
     # Create results directory if it doesn't exist
-    result_folder = 'results'
-    os.makedirs(result_folder, exist_ok=True)
+    result_folder = ensure_dir(RESULTS_DIR)
 
     # Generate filename with datetime
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -92,12 +88,26 @@ def check(enumerator, testEmail, verbose, enum_output):
         print_color(f"An error occurred: {e}", color="red")
         traceback.print_exc()
 
+def _try_scope(delegated_credentials, scope, request):
+    """Try to obtain a delegated access token for a single scope
+
+    Args:
+        delegated_credentials: Service account credentials with the test user as subject
+        scope (str): OAuth scope to request
+        request: Shared google.auth transport used for the token exchange
+
+    Returns:
+        tuple: (scope, None) on success, (scope, exception) on failure
+    """
+    try:
+        scoped_credentials = delegated_credentials.with_scopes([scope])
+        scoped_credentials.refresh(request)
+        return scope, None
+    except Exception as e:
+        return scope, e
+
 def test_service_account_key(credentials, args, verbose=False):
     """Test a service account key file for Domain-Wide Delegation privileges"""
-    from google.oauth2.credentials import Credentials
-    from googleapiclient.discovery import build
-    import google.auth.transport.requests
-    
     # Create custom credentials and enumerator
     try:
         enumerator = ServiceAccountEnumerator(credentials, verbose=verbose)
@@ -123,29 +133,27 @@ def test_service_account_key(credentials, args, verbose=False):
         test_scopes = [line.strip() for line in file.readlines()]
     
     print_color("\nTesting for Domain-Wide Delegation privileges...", color="cyan")
-    
-    
+
+    # Each scope costs a JWT signature and a token exchange round trip, test them concurrently
+    delegated_credentials = credentials.with_subject(test_user)
+    # One pooled session for all token exchanges, sized to the worker count
+    with requests.Session() as session:
+        adapter = HTTPAdapter(pool_connections=SCOPE_TEST_WORKERS, pool_maxsize=SCOPE_TEST_WORKERS)
+        session.mount('https://', adapter)
+        request = Request(session=session)
+        with ThreadPoolExecutor(max_workers=SCOPE_TEST_WORKERS) as executor:
+            outcomes = list(executor.map(lambda scope: _try_scope(delegated_credentials, scope, request), test_scopes))
+
     authorized_scopes = []
-    
-    for scope in test_scopes:
-        try:
-            # Try to create delegated credentials
-            delegated_credentials = credentials.with_subject(test_user)
-            delegated_credentials = delegated_credentials.with_scopes([scope])
-            
-            # Try to refresh the token
-            request = google.auth.transport.requests.Request()
-            delegated_credentials.refresh(request)
-            
+    for scope, error in outcomes:
+        if error is None:
             authorized_scopes.append(scope)
             if verbose:
                 print_color(f"✓ Successfully authorized scope: {scope}", color="green")
-                
-        except Exception as e:
-            if verbose:
-                print_color(f"× Failed to authorize scope: {scope}", color="red")
-                print_color(f"  Error: {str(e)}", color="red")
-    
+        elif verbose:
+            print_color(f"× Failed to authorize scope: {scope}", color="red")
+            print_color(f"  Error: {str(error)}", color="red")
+
     # Print results
     if authorized_scopes:
         print_color("\n[!] Service account has Domain-Wide Delegation enabled!", color="yellow")
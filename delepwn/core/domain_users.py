@@ -1,5 +1,9 @@
 from delepwn.utils.output import print_color
-from delepwn.utils.api import handle_api_ratelimit
+from delepwn.utils.api import execute_batch
+from delepwn.core.enumerator import IAM_POLICY_REQUEST_BODY
+
+USER_MEMBER_PREFIX = 'user:'
+SERVICE_ACCOUNT_SUFFIX = '.gserviceaccount.com'
 
 class DomainUserEnumerator:
     """ Find target Workspace users using GCP projects role enumeration. returns one email address per distinct domain org """
@@ -7,31 +11,59 @@ class DomainUserEnumerator:
         self.gcp_project_enumerator = gcp_project_enumerator
         self.single_test_email = {}
 
-    @handle_api_ratelimit
-    def list_unique_domain_users(self):
-        """List unique domain users across projects (excluding service accounts)"""
+    def list_unique_domain_users(self, max_domains=None):
+        """List unique domain users across projects (excluding service accounts)
+        
+        Throttled getIamPolicy calls are retried individually by execute_batch.
+        
+        Args:
+            max_domains (int, optional): Stop scanning projects once this many domains were found
+        """
         unique_domains = {}
-        for project_id in self.gcp_project_enumerator.get_projects():
-            resource_manager_service = self.gcp_project_enumerator.resource_manager_service
-            request = resource_manager_service.projects().getIamPolicy(resource=project_id, body={})
-            response = request.execute()
+        errors = []
+        resource_manager_service = self.gcp_project_enumerator.resource_manager_service
+
+        def done():
+            return max_domains is not None and len(unique_domains) >= max_domains
 
+        def collect(project_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
+                return
+            if done():
+                return
             if 'bindings' in response:
                 for binding in response['bindings']:
                     if 'members' in binding:
                         for member in binding['members']:
-                            if member.startswith('user:'):
-                                email = member.split(':')[1]
-                                # exclude GCP service accounts
-                                if '@' in email and not email.endswith('.gserviceaccount.com'):
-                                    domain = email.split('@')[1]
-                                    if domain not in unique_domains:
-                                        unique_domains[domain] = email
-                                        break
+                            if not member.startswith(USER_MEMBER_PREFIX):
+                                continue
+                            email = member[len(USER_MEMBER_PREFIX):]
+                            _, at, domain = email.partition('@')
+                            # exclude GCP service accounts
+                            if not at or domain.endswith(SERVICE_ACCOUNT_SUFFIX):
+                                continue
+                            # First email seen for a domain wins; a single hash operation per member
+                            if unique_domains.setdefault(domain, email) is email:
+                                if done():
+                                    return
+                                break
+
+        # One batched HTTP call per 100 projects instead of one call per project
+        def requests():
+            for project_id in self.gcp_project_enumerator.get_projects():
+                # Results arrive per batch, so this stops queuing projects after the batch that filled the quota
+                if done():
+                    return
+                yield project_id, resource_manager_service.projects().getIamPolicy(resource=project_id, body=IAM_POLICY_REQUEST_BODY)
+
+        execute_batch(resource_manager_service, requests(), collect)
+        if errors:
+            raise errors[0]
+
         self.single_test_email = unique_domains
         return unique_domains
 
-
     def print_unique_domain_users(self):
         unique_domain_users = self.list_unique_domain_users()
         if unique_domain_users:
@@ -47,7 +79,7 @@ class DomainUserEnumerator:
     def get_first_valid_domain_user(self):
         """Get the first valid domain user email found during enumeration"""
         try:
-            self.list_unique_domain_users()
+            self.list_unique_domain_users(max_domains=1)
             if self.single_test_email:
                 first_email = next(iter(self.single_test_email.values()))
                 return first_email
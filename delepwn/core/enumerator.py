@@ -1,20 +1,24 @@
 import requests
-from googleapiclient.discovery import build
 from delepwn.core.key_manager import PrivateKeyCreator
 from delepwn.utils.output import print_color
-from delepwn.utils.api import handle_api_ratelimit
+from delepwn.utils.api import handle_api_ratelimit, build_service
 from delepwn.auth.credentials import CustomCredentials
 import sys
 
+KEY_CREATE_PERMISSION = 'iam.serviceAccountKeys.create'
+# Policy version 3 returns conditional role bindings as well
+IAM_POLICY_REQUEST_BODY = {'options': {'requestedPolicyVersion': 3}}
+
 class ServiceAccountEnumerator:
     """Enumerate GCP Projects and Service Accounts and find roles with iam.serviceAccountKeys.create permission"""
     def __init__(self, credentials, verbose=False, project_id=None, current_email=None):
         self.credentials = credentials
-        self.resource_manager_service = build('cloudresourcemanager', 'v1', credentials=self.credentials)
-        self.iam_service = build('iam', 'v1', credentials=self.credentials)
+        self.resource_manager_service = build_service('cloudresourcemanager', 'v1', credentials=self.credentials)
+        self.iam_service = build_service('iam', 'v1', credentials=self.credentials)
         self.key_creator = PrivateKeyCreator(credentials)
         self.verbose = verbose
         self.project_id = project_id
+        self._permission_cache = {}  # role name -> has iam.serviceAccountKeys.create
         
         # Handle both CustomCredentials and direct service account credentials
         if current_email:            
@@ -95,7 +99,7 @@ class ServiceAccountEnumerator:
         """Get Project-level roles of the IAM User/SA from the IAM Policy"""
         request = self.resource_manager_service.projects().getIamPolicy(
             resource=project_id,
-            body={}
+            body=IAM_POLICY_REQUEST_BODY
         )
         response = request.execute()
         roles = []
@@ -140,6 +144,8 @@ class ServiceAccountEnumerator:
 
     def check_permission(self, role):
         """Check if the target role has iam.serviceAccountKeys.create permission"""
+        if role in self._permission_cache:
+            return self._permission_cache[role]
         try:
             if "projects/" in role:
                 request = self.iam_service.projects().roles().get(name=role)
@@ -147,7 +153,9 @@ class ServiceAccountEnumerator:
                 request = self.iam_service.roles().get(name=role)
 
             response = request.execute()
-            return 'iam.serviceAccountKeys.create' in response.get('includedPermissions', [])
+            has_permission = KEY_CREATE_PERMISSION in response.get('includedPermissions', [])
+            self._permission_cache[role] = has_permission
+            return has_permission
         except Exception as e:
             if self.verbose:
                 print_color(f"Error checking role {role}: {str(e)}", color="yellow")
@@ -201,19 +209,25 @@ class ServiceAccountEnumerator:
             sys.exit(1)
 
     @handle_api_ratelimit
-    def list_projects(self):
-        """List accessible GCP projects with details and access information"""
+    def _fetch_page(self, request):
+        """Execute a single page request of a paginated listing"""
+        return request.execute()
+
+    def iter_projects(self):
+        """Yield accessible GCP projects with details and access information as each page arrives"""
         try:
-            request = self.resource_manager_service.projects().list()
-            response = request.execute()
-            projects = response.get('projects', [])
-            
-            for project in projects:
-                project_id = project['projectId']
-                project['roles'] = self.get_project_roles(project_id)
-            return projects
+            projects = self.resource_manager_service.projects()
+            request = projects.list()
+            while request is not None:
+                response = self._fetch_page(request)
+                for project in response.get('projects', []):
+                    project['roles'] = self.get_project_roles(project['projectId'])
+                    yield project
+                request = projects.list_next(request, response)
         except Exception as e:
             print_color(f"Failed to list projects: {e}", color="red")
             raise e
 
-
+    def list_projects(self):
+        """List accessible GCP projects with details and access information"""
+        return list(self.iter_projects())
@@ -1,54 +1,82 @@
 import os
 import json
 import base64
+try:
+    import orjson
+except ImportError:  # optional, key files are then parsed with the stdlib json module
+    orjson = None
 from google.oauth2 import service_account
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from delepwn.utils.output import print_color
-from delepwn.config.settings import SERVICE_ACCOUNT_KEY_FOLDER
+from delepwn.utils.api import execute_batch, build_service
+from delepwn.config.settings import SERVICE_ACCOUNT_KEY_FOLDER, ensure_dir
+
+
+def _load_key_json(data):
+    """Parse key file content (bytes or str); decode errors are json.JSONDecodeError either way"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 class PrivateKeyCreator:
     """ Creates GCP private key pairs for SAs with permissions """
     def __init__(self, credentials):
         self.credentials = credentials
-        self.iam_service = build('iam', 'v1', credentials=self.credentials)
-        self.keys_directory = SERVICE_ACCOUNT_KEY_FOLDER
-        os.makedirs(self.keys_directory, exist_ok=True)
+        self.iam_service = build_service('iam', 'v1', credentials=self.credentials)
+        self.keys_directory = ensure_dir(SERVICE_ACCOUNT_KEY_FOLDER)
+        self._key_index = None  # client_email -> (path, key_data), loaded on first use
+
+    @property
+    def key_index(self):
+        """Local keys by client_email, read with a single pass over the key folder"""
+        if self._key_index is None:
+            self._key_index = {}
+            with os.scandir(self.keys_directory) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    try:
+                        with open(entry.path, 'rb') as f:
+                            key_data = _load_key_json(f.read())
+                    except json.JSONDecodeError:
+                        print_color(f"[!] Invalid JSON in key file {entry.path}", color="red")
+                        continue
+                    except OSError as e:
+                        print_color(f"[!] Error reading key file {entry.path}: {str(e)}", color="red")
+                        continue
+                    client_email = key_data.get('client_email') if isinstance(key_data, dict) else None
+                    if client_email:
+                        self._key_index.setdefault(client_email, (entry.path, key_data))
+        return self._key_index
     
+    def _key_file_path(self, service_account_path):
+        """Local path a key of the service account is saved to"""
+        file_name = service_account_path.replace('/', '_').replace(':', '_')
+        return os.path.join(self.keys_directory, f"{file_name}.json")
+
     def check_existing_key(self, service_account_path):
         """Check if a valid key already exists for this service account"""
         sa_email = service_account_path.split('/')[-1]
-        for key_file in os.listdir(self.keys_directory):
-            file_path = os.path.join(self.keys_directory, key_file)
+        entry = self.key_index.get(sa_email)
+        if entry is None:
+            return False
+        file_path, key_data = entry
+
+        # Validate the key still works
+        try:
+            creds = service_account.Credentials.from_service_account_info(
+                key_data,
+                scopes=['https://www.googleapis.com/auth/cloud-platform.read-only']
+            )
+            creds.refresh(Request())
+            print_color(f"  Using existing valid key for {sa_email} at {file_path}\n", color="blue")
+            return True
+        except Exception as e:
+            print_color(f"  Found existing key for {sa_email} but it's invalid ({str(e)}), creating new one.", color="blue")
+            self.key_index.pop(sa_email, None)
             try:
-                # Use a context manager for proper file handling
-                with open(file_path, 'r') as f:
-                    try:
-                        key_data = json.load(f)
-                        if key_data.get('client_email') == sa_email:
-                            # Validate the key still works
-                            try:
-                                creds = service_account.Credentials.from_service_account_info(
-                                    key_data,
-                                    scopes=['https://www.googleapis.com/auth/cloud-platform.read-only']
-                                )
-                                creds.refresh(Request())
-                                print_color(f"  Using existing valid key for {sa_email} at {file_path}\n", color="blue")
-                                return True
-                            except Exception as e:
-                                print_color(f"  Found existing key for {sa_email} but it's invalid ({str(e)}), creating new one.", color="blue")
-                                # Make sure file is closed before trying to remove it
-                                try:
-                                    f.close()  # Ensure the file is closed
-                                    os.remove(file_path)
-                                except OSError as ose:
-                                    print_color(f"[!] Could not remove invalid key file: {str(ose)}", color="yellow")
-                    except json.JSONDecodeError:
-                        print_color(f"[!] Invalid JSON in key file {file_path}", color="red")
-            except Exception as e:
-                print_color(f"[!] Error checking existing key {file_path}: {str(e)}", color="red")
-                continue
+                os.remove(file_path)
+            except OSError as ose:
+                print_color(f"[!] Could not remove invalid key file: {str(ose)}", color="yellow")
         return False
 
     def create_service_account_key(self, service_account_path):
@@ -66,13 +94,13 @@ class PrivateKeyCreator:
             ).execute()
 
             # The private key data is a base64-encoded JSON string within the attr privateKeyData
-            key_json = base64.b64decode(key['privateKeyData']).decode('utf-8')
-            key_data = json.loads(key_json)
+            key_json = base64.b64decode(key['privateKeyData'])
+            key_data = _load_key_json(key_json)
 
-            file_name = service_account_path.replace('/', '_').replace(':', '_')
-            file_path = os.path.join(self.keys_directory, f"{file_name}.json")
-            with open(file_path, "w") as file:
-                json.dump(key_data, file)  # Save the decoded key data, not the entire key object
+            file_path = self._key_file_path(service_account_path)
+            with open(file_path, "wb") as file:
+                file.write(key_json)  # Save the decoded key data as is, not the entire key object
+            self.key_index[key_data.get('client_email')] = (file_path, key_data)
 
             print_color(f"\n[*] Key created and saved to {file_path}", color="blue")
 
@@ -89,6 +117,12 @@ class PrivateKeyCreator:
         """ Delete the remote service account key """
         try:
             self.iam_service.projects().serviceAccounts().keys().delete(name=key_name).execute()
+            # projects/{project}/serviceAccounts/{email}/keys/{key_id}
+            parts = key_name.split('/')
+            if len(parts) == 6:
+                entry = self.key_index.get(parts[3])
+                if entry and entry[1].get('private_key_id') == parts[5]:
+                    del self.key_index[parts[3]]
             print_color(f"✓ Successfully deleted remote service account key: {key_name}", color="green")
         except Exception as e:
             print_color(f"[!] Error deleting remote key {key_name}: {e}", color="red")
@@ -100,16 +134,22 @@ class PrivateKeyCreator:
         
         try:
             # Get list of all key files
-            key_files = os.listdir(self.keys_directory)
+            with os.scandir(self.keys_directory) as entries:
+                key_files = [entry.name for entry in entries if entry.is_file()]
+
+            # Key data already read by the index, by path
+            indexed_keys = dict(self.key_index.values())
             
             # Convert confirmed_dwd_keys to just filenames
-            dwd_filenames = [os.path.basename(path) for path in confirmed_dwd_keys]
+            dwd_filenames = {os.path.basename(path) for path in confirmed_dwd_keys}
             
             # Track statistics
             total_keys = len(key_files)
             dwd_keys = 0
             deleted_keys = 0
             
+            # Read every key to remove first, so the remote deletes can be batched
+            removals = []  # (key_file, key_path, client_email, full_key_name or None)
             for key_file in key_files:
                 key_path = os.path.join(self.keys_directory, key_file)
                 
@@ -120,25 +160,51 @@ class PrivateKeyCreator:
                     continue
                     
                 try:
-                    # Read the key file to get the key ID
-                    with open(key_path, 'r') as f:
-                        key_data = json.load(f)
-                        
-                    # Delete the remote key
-                    key_id = key_data.get('private_key_id')
-                    project_id = key_data.get('project_id')
-                    client_email = key_data.get('client_email')
-                    
-                    if key_id and project_id and client_email:
-                        # Format the key name according to the required pattern
-                        full_key_name = f"projects/{project_id}/serviceAccounts/{client_email}/keys/{key_id}"
-                        self.iam_service.projects().serviceAccounts().keys().delete(
-                            name=full_key_name
-                        ).execute()
-                        print_color(f"-> Removed remote key: {full_key_name}", color="white")
-                    
+                    key_data = indexed_keys.get(key_path)
+                    if key_data is None:
+                        # Not indexed (e.g. a second key of the same account), read it to get the key ID
+                        with open(key_path, 'rb') as f:
+                            key_data = _load_key_json(f.read())
+                except Exception as e:
+                    print_color(f"-> Failed to remove key {key_file}: {str(e)}", color="red")
+                    continue
+
+                key_id = key_data.get('private_key_id')
+                project_id = key_data.get('project_id')
+                client_email = key_data.get('client_email')
+                full_key_name = None
+                if key_id and project_id and client_email:
+                    # Format the key name according to the required pattern
+                    full_key_name = f"projects/{project_id}/serviceAccounts/{client_email}/keys/{key_id}"
+                removals.append((key_file, key_path, client_email, full_key_name))
+
+            # Delete the remote keys, up to 100 per HTTP call
+            remote_errors = {}
+
+            def collect(key_file, response, exception):
+                if exception is not None:
+                    remote_errors[key_file] = exception
+
+            keys_resource = self.iam_service.projects().serviceAccounts().keys()
+            execute_batch(
+                self.iam_service,
+                ((key_file, keys_resource.delete(name=full_key_name))
+                 for key_file, _, _, full_key_name in removals if full_key_name),
+                collect
+            )
+
+            for key_file, key_path, client_email, full_key_name in removals:
+                if key_file in remote_errors:
+                    print_color(f"-> Failed to remove key {key_file}: {str(remote_errors[key_file])}", color="red")
+                    continue
+                if full_key_name:
+                    print_color(f"-> Removed remote key: {full_key_name}", color="white")
+
+                try:
                     # Delete the local key file
                     os.remove(key_path)
+                    if client_email and self.key_index.get(client_email, (None,))[0] == key_path:
+                        del self.key_index[client_email]
                     print_color(f"-> Removed local key: {key_file}", color="white")
                     deleted_keys += 1
                     
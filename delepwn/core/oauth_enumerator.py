@@ -3,6 +3,10 @@ from google.auth.transport.requests import Request
 from google.auth.exceptions import DefaultCredentialsError, RefreshError
 from delepwn.core.domain_users import DomainUserEnumerator
 from delepwn.utils.output import print_color
+from delepwn.config.settings import TOKEN_VALIDATION_WORKERS
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 import requests
 import os
 from tqdm import tqdm
@@ -14,11 +18,32 @@ class OAuthEnumerator:
         self.gcp_project_enumerator = gcp_project_enumerator
         self.scopes_file = scopes_file
         self.key_folder = key_folder
+        self._key_files = None
         self.scopes = self.read_scopes_from_file()
+        self._scopes_list = tuple(self.scopes)  # iteration order for jwt_creator
         self.valid_results = {}
         self.verbose = verbose
         self.confirmed_dwd_keys = []  # Keep track of keys with DWD
-        self.user_emails = list(single_test_email.values())
+        self._confirmed_set = set()  # membership checks for confirmed_dwd_keys
+        self.user_emails = tuple(single_test_email.values())
+        self._dwd_scopes = {}  # json_path -> scopes confirmed by a worker, for skipping
+
+        # One pooled session shared by all workers, sized to the worker count
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=TOKEN_VALIDATION_WORKERS, pool_maxsize=TOKEN_VALIDATION_WORKERS)
+        self._session.mount('https://', adapter)
+        self._request = Request(session=self._session)
+
+    @property
+    def key_files(self):
+        """Paths of the private key files in key_folder, scanned once per run"""
+        if self._key_files is None:
+            if os.path.isdir(self.key_folder):
+                with os.scandir(self.key_folder) as entries:
+                    self._key_files = tuple(entry.path for entry in entries if entry.is_file())
+            else:
+                self._key_files = ()
+        return self._key_files
 
     def get_valid_results(self):
         return self.valid_results
@@ -28,14 +53,11 @@ class OAuthEnumerator:
         try:
             scope_dict = {}
             with open(self.scopes_file, 'r') as file:
-                content = file.readlines()
-                for line in content:
-                    line = line.strip()
-                    if line and '|' in line:
-                        scope, description = line.split('|', 1)
-                        scope = scope.strip()
-                        description = description.strip()
-                        scope_dict[scope] = description
+                data = file.read()
+            for line in data.splitlines():
+                scope, sep, description = line.partition('|')
+                if sep:
+                    scope_dict[scope.strip()] = description.strip()
             return scope_dict
             
         except FileNotFoundError:
@@ -51,20 +73,16 @@ class OAuthEnumerator:
         return list(unique_users.values())
 
     def jwt_creator(self):
-        """ Create JWT objects for each combination of workspace distinct org email, OAuth scope, and private key pair  """
-        jwt_objects = []
-        for json_file in os.listdir(self.key_folder):
-            json_path = os.path.join(self.key_folder, json_file)
+        """ Yield JWT objects for each combination of workspace distinct org email, OAuth scope, and private key pair  """
+        for json_path in self.key_files:
+            # Parse the key file and its RSA key once, derived credentials share the signer
+            base_creds = service_account.Credentials.from_service_account_file(json_path)
 
             for user_email in self.user_emails:
-                for scope in self.scopes.keys():  # Use keys() since scopes is now a dictionary
-                    creds = service_account.Credentials.from_service_account_file(
-                        json_path,
-                        scopes=[scope],
-                    )
-                    creds = creds.with_subject(user_email)
-                    jwt_objects.append((json_path, user_email, scope, creds))
-        return jwt_objects
+                subject_creds = base_creds.with_subject(user_email)
+                for scope in self._scopes_list:
+                    creds = subject_creds.with_scopes([scope])
+                    yield json_path, user_email, scope, creds
 
     def print_valid_output(self):
         """Print OAuth enumeration results in a standardized format"""
@@ -84,43 +102,73 @@ class OAuthEnumerator:
             
             print_color("-" * 50, color="blue")
 
+    def _validate(self, jwt_object):
+        """Refresh the access token of a single JWT combination, runs on a worker thread
+
+        Combinations whose key and scope were already confirmed with another user are skipped
+        and reported as not valid, so each scope is recorded once per key.
+
+        Returns:
+            tuple: (json_path, scope, valid, error) where error is the exception raised, if any
+        """
+        json_path, user_email, scope, creds = jwt_object
+        # Skip scopes already confirmed for this key with another user
+        if scope in self._dwd_scopes.get(json_path, ()):
+            return json_path, scope, False, None
+        try:
+            # A token is only issued if DWD grants the scope, otherwise refresh raises RefreshError
+            creds.refresh(self._request)
+            self._dwd_scopes.setdefault(json_path, set()).add(scope)
+            return json_path, scope, True, None
+        except Exception as e:
+            return json_path, scope, False, e
+
+    @staticmethod
+    def _bounded_map(executor, fn, items, limit):
+        """Like executor.map, but pulls items lazily and keeps at most limit of them in flight
+
+        Results are yielded in submission order.
+        """
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
     def token_validator(self, jwt_objects):
-        """ Validate access tokens for each JWT object combination  """
-        total = len(jwt_objects)
+        """ Validate access tokens for each JWT object combination, jwt_objects may be a lazy iterable  """
+        total = self.total_jwt_combinations()
         
         print_color("\nValidating OAuth tokens and DWD access:", color="cyan")
         print_color("-" * 50, color="blue")
         print_color(f"Total combinations to check: {total}", color="white")
-        print_color(f"Service Accounts: {len(os.listdir(self.key_folder))}", color="white")
+        print_color(f"Service Accounts: {len(self.key_files)}", color="white")
         print_color(f"OAuth Scopes: {len(self.scopes)}", color="white")
         print_color(f"Target Users: {len(self.user_emails)}", color="white")
         print_color("-" * 50, color="blue")
 
-        with tqdm(total=total, desc="Progress", unit="token") as pbar:
-            for json_path, user_email, scope, creds in jwt_objects:
-                try:
-                    creds.refresh(Request())
-                    token_info_url = f"https://www.googleapis.com/oauth2/v1/tokeninfo?access_token={creds.token}"
-                    response = requests.get(token_info_url)
-
-                    if response.status_code == 200:
-                        self.valid_results.setdefault(json_path, []).append(scope)
-                        if json_path not in self.confirmed_dwd_keys:
-                            self.confirmed_dwd_keys.append(json_path)
-                            if self.verbose:
-                                tqdm.write(f"-> Found valid DWD access with scope: {scope}")
-
-                except DefaultCredentialsError:
-                    if self.verbose:
+        with tqdm(total=total, desc="Progress", unit="token") as pbar, \
+                ThreadPoolExecutor(max_workers=TOKEN_VALIDATION_WORKERS) as executor:
+            # Results are consumed in submission order, so only this thread touches the results
+            results = self._bounded_map(executor, self._validate, jwt_objects, 2 * TOKEN_VALIDATION_WORKERS)
+            for json_path, scope, valid, error in results:
+                if valid:
+                    self.valid_results.setdefault(json_path, []).append(scope)
+                    if json_path not in self._confirmed_set:
+                        self._confirmed_set.add(json_path)
+                        self.confirmed_dwd_keys.append(json_path)
+                        if self.verbose:
+                            tqdm.write(f"-> Found valid DWD access with scope: {scope}")
+                elif self.verbose and error is not None:
+                    if isinstance(error, DefaultCredentialsError):
                         tqdm.write("The service account file is not valid or doesn't exist.")
-                except RefreshError as e:
-                    if self.verbose:
+                    elif isinstance(error, RefreshError):
                         tqdm.write(f"-> Invalid or expired token with scope {scope}")
-                except Exception as e:
-                    if self.verbose:
-                        tqdm.write(f"-> Error validating token: {str(e)}")
-                finally:
-                    pbar.update(1)
+                    else:
+                        tqdm.write(f"-> Error validating token: {str(error)}")
+                pbar.update(1)
 
         if self.valid_results:
             print_color("\nResults Summary:", color="cyan")
@@ -132,7 +180,7 @@ class OAuthEnumerator:
         """ calculate total combinations of JWT based on the number of enumerated OAuth scopes, GCP private keys pairs and target workspace org emails
         (oauth_scopes.txt number * private key pairs * target workspace org (distinct) emails)"""
         num_scopes = len(self.scopes)
-        num_keys = len(os.listdir(self.key_folder))
+        num_keys = len(self.key_files)
         num_emails = len(self.user_emails)
         return num_scopes * num_keys * num_emails
 
@@ -148,7 +196,8 @@ class OAuthEnumerator:
                 print_color(f"Scopes file location: {self.scopes_file}", color="blue")
             return
 
-        if not os.path.exists(self.key_folder) or not os.listdir(self.key_folder):
+        self._key_files = None  # pick up keys created since the last scan
+        if not self.key_files:
             print_color("[!] No GCP private key pairs were found. It might suggest the IAM user doesn't have permission to create keys on target Service Accounts. Try to use different GCP identity", color="red")
             return
 
@@ -156,8 +205,7 @@ class OAuthEnumerator:
         if self.verbose:
             print_color(f"Total scope combinations to test: {total_combinations}", color="blue")
             print_color(f"Number of scopes: {len(self.scopes)}", color="blue")
-            print_color(f"Number of keys: {len(os.listdir(self.key_folder))}", color="blue")
+            print_color(f"Number of keys: {len(self.key_files)}", color="blue")
             print_color(f"Number of users: {len(self.user_emails)}", color="blue")
 
-        jwt_objects = self.jwt_creator()
-        self.token_validator(jwt_objects)
+        self.token_validator(self.jwt_creator())
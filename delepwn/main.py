@@ -4,6 +4,14 @@ from delepwn.utils.output import print_color
 from delepwn.cli.parser import ArgumentParser
 from delepwn.cli.handler import CommandHandler
 
+COMMAND_HANDLERS = {
+    'enum': CommandHandler.handle_enum_command,
+    'drive': CommandHandler.handle_drive_command,
+    'calendar': CommandHandler.handle_calendar_command,
+    'admin': CommandHandler.handle_admin_command,
+    'gmail': CommandHandler.handle_gmail_command,
+}
+
 def main():
     """Main entry point for the application"""
     try:
@@ -12,24 +20,16 @@ def main():
         args = parser.parse_args()
 
         # Handle commands based on user input
-        if args.command == 'enum':
-            CommandHandler.handle_enum_command(args)
-        elif args.command == 'drive':
-            CommandHandler.handle_drive_command(args)
-        elif args.command == 'calendar':
-            CommandHandler.handle_calendar_command(args)
-        elif args.command == 'admin':
-            CommandHandler.handle_admin_command(args)
-        elif args.command == 'gmail':
-            CommandHandler.handle_gmail_command(args)
+        handler = COMMAND_HANDLERS.get(args.command)
+        if handler:
+            handler(args)
         else:
             parser.print_help()
-            
+
     except Exception as e:
         print_color("An unexpected error occurred:", color="red")
         print(traceback.format_exc())
         sys.exit(1)
-    pass
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,7 @@
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from delepwn.utils.output import print_color
+from delepwn.utils.api import build_service
 import random
 import string
 
@@ -37,7 +37,7 @@ class AdminManager:
             subject=impersonate_email
         )
         
-        self.service = build('admin', 'directory_v1', credentials=credentials)
+        self.service = build_service('admin', 'directory_v1', credentials=credentials)
         self.current_user = impersonate_email
         print_color(f"✓ Initialized admin service for {impersonate_email}", color="green")
 
@@ -1,11 +1,78 @@
+import io
 import os
+import sys
+import uuid
+import functools
 import yaml
-from datetime import datetime
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from delepwn.utils.output import print_color
-from delepwn.utils.api import handle_api_ratelimit
+from delepwn.utils.output import print_color, colorizer
+from delepwn.utils.api import handle_api_ratelimit, execute_batch, authorized_http, build_service
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Partial-response masks limited to the attributes that are printed
+EVENT_LIST_FIELDS = 'nextPageToken,items(id,summary,start(dateTime,date,timeZone),creator/email,attendees/email)'
+EVENT_DETAIL_FIELDS = 'summary,start(dateTime,date),end(dateTime,date),location,description,attendees(email,responseStatus)'
+
+# Colors of the event printing, escape codes resolved once
+_white, _cyan = colorizer('white'), colorizer('cyan')
+_SEPARATOR = colorizer('blue')("-" * 50)
+
+# Phishing event configuration keys: (expected type, required)
+EVENT_CONFIG_SCHEMA = {
+    'summary': (str, True),
+    'description': (str, True),
+    'start_time': (str, False),
+    'end_time': (str, False),
+    'timezone': (str, False),
+    'location': (str, False),
+    'attendees': (list, False),
+    'reminder_minutes': (int, False),
+    'popup_minutes': (int, False),
+    'conference_solution': (str, False),
+    'send_notifications': (bool, False),
+}
+
+
+@functools.lru_cache(maxsize=16)
+def _load_event_config(config_path, mtime):
+    """Parse a YAML event configuration, cached per path and modification time
+    
+    The returned configuration is shared between calls and must not be mutated.
+    """
+    with open(config_path, 'rb') as file:
+        return yaml.load(file, Loader=YAML_LOADER)
+
+
+def validate_event_config(config):
+    """Validate a loaded phishing event configuration in a single pass
+    
+    Args:
+        config (dict): Parsed YAML configuration
+        
+    Returns:
+        dict: The 'event' section of the configuration
+        
+    Raises:
+        ValueError: If a required key is missing or a key has the wrong type
+    """
+    if not isinstance(config, dict) or not isinstance(config.get('event'), dict):
+        raise ValueError("Configuration must contain an 'event' section")
+
+    event_config = config['event']
+    for key, (expected_type, required) in EVENT_CONFIG_SCHEMA.items():
+        if key not in event_config:
+            if required:
+                raise ValueError(f"Missing required event field '{key}'")
+            continue
+        if not isinstance(event_config[key], expected_type):
+            raise ValueError(f"Event field '{key}' must be of type {expected_type.__name__}")
+
+    if not all(isinstance(email, str) for email in event_config.get('attendees', [])):
+        raise ValueError("Event field 'attendees' must be a list of email addresses")
+    return event_config
 
 class CalendarManager:
     """Manage Google Calendar operations including listing, updating, and creating events"""
@@ -23,63 +90,123 @@ class CalendarManager:
         self.SCOPES = ['https://www.googleapis.com/auth/calendar']
         self.service = None
         self.current_user = None
+        self._services = {}  # impersonated email -> built Calendar service
+        # Parse the key once; per-user credentials share its signer
+        self._base_credentials = service_account.Credentials.from_service_account_file(
+            self.SERVICE_ACCOUNT_FILE,
+            scopes=self.SCOPES
+        )
 
     def initialize_service(self, impersonate_email):
         """Initialize the Calendar Query with impersonation"""
         if not impersonate_email:
             raise ValueError("Impersonation email is required")
             
-        credentials = service_account.Credentials.from_service_account_file(
-            self.SERVICE_ACCOUNT_FILE,
-            scopes=self.SCOPES,
-            subject=impersonate_email
-        )
-        
-        self.service = build('calendar', 'v3', credentials=credentials)
+        service = self._services.get(impersonate_email)
+        if service is None:
+            credentials = self._base_credentials.with_subject(impersonate_email)
+            service = build_service('calendar', 'v3', http=authorized_http(credentials))
+            self._services[impersonate_email] = service
+        self.service = service
         self.current_user = impersonate_email
         print_color(f"-> Querying Calendar for {impersonate_email}", color="cyan")
 
+    def iter_event_pages(self, start_date, end_date, ordered=True, expand_recurring=True):
+        """Yield pages of events between specified dates, fetching one page at a time
+        
+        Args:
+            start_date (datetime): Start of the time range
+            end_date (datetime): End of the time range
+            ordered (bool): Sort events by start time (requires expand_recurring)
+            expand_recurring (bool): Return every instance of recurring events
+                instead of a single entry per series
+        """
+        if not self.service:
+            raise ValueError("Service not initialized")
+
+        params = {
+            'calendarId': 'primary',
+            'timeMin': start_date.isoformat() + 'Z',
+            'timeMax': end_date.isoformat() + 'Z',
+            'singleEvents': expand_recurring,
+            'maxResults': 2500,
+            'fields': EVENT_LIST_FIELDS,
+        }
+        # The API only sorts by start time when recurring events are expanded
+        if ordered and expand_recurring:
+            params['orderBy'] = 'startTime'
+
+        events = self.service.events()
+        request = events.list(**params)
+        while request is not None:
+            response = self._fetch_page(request)
+            yield response.get('items', [])
+            request = events.list_next(request, response)
+
     @handle_api_ratelimit
-    def list_events(self, start_date, end_date):
+    def _fetch_page(self, request):
+        """Execute a single page request, retried on its own when rate limited"""
+        return request.execute()
+
+    def iter_events(self, start_date, end_date, ordered=True, expand_recurring=True):
+        """Yield events between specified dates, fetching one page at a time"""
+        for page in self.iter_event_pages(start_date, end_date, ordered, expand_recurring):
+            yield from page
+
+    def get_events(self, start_date, end_date, ordered=True, expand_recurring=True):
+        """Return all events between specified dates as a list"""
+        return list(self.iter_events(start_date, end_date, ordered, expand_recurring))
+
+    def list_events(self, start_date, end_date, ordered=True, expand_recurring=True):
         """List events between specified dates"""
         if not self.service:
             raise ValueError("Service not initialized")
 
         try:
-            events_result = self.service.events().list(
-                calendarId='primary',
-                timeMin=start_date.isoformat() + 'Z',
-                timeMax=end_date.isoformat() + 'Z',
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            events = events_result.get('items', [])
-
-            if not events:
+            found = False
+            for page in self.iter_event_pages(start_date, end_date, ordered, expand_recurring):
+                if page:
+                    self.print_events(page, header=not found)
+                    found = True
+            if not found:
                 print_color("No events found.", color="yellow")
-                return
-
-            print_color("\nEvents:", color="cyan")
-            print_color("-" * 50, color="blue")
-            
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                timezone = event['start'].get('timeZone', '')
-                creator = event['creator'].get('email', 'Unknown')
-                attendees = event.get('attendees', [])
-                total_attendees = len(attendees)
-                summary = event.get('summary', 'No Title')
-
-                print_color(f"Title: {summary}", color="white")
-                print_color(f"Start: {start} {timezone}", color="white")
-                print_color(f"ID: {event['id']}", color="white")
-                print_color(f"Creator: {creator}", color="white")
-                print_color(f"Attendees: {total_attendees}", color="white")
-                print_color("-" * 50, color="blue")
-
         except HttpError as error:
             print_color(f"Error listing events: {error}", color="red")
 
+    def print_events(self, events, header=True):
+        """Print events in a standardized format with a single write
+        
+        Args:
+            events (list): Event resources to print
+            header (bool): Whether to print the 'Events:' header first
+        """
+        if not events:
+            print_color("No events found.", color="yellow")
+            return
+
+        buf = io.StringIO()
+        if header:
+            buf.write(_cyan("\nEvents:") + "\n" + _SEPARATOR + "\n")
+
+        for event in events:
+            start = event['start'].get('dateTime', event['start'].get('date'))
+            timezone = event['start'].get('timeZone', '')
+            creator = event.get('creator', {}).get('email', 'Unknown')
+            total_attendees = len(event.get('attendees', []))
+            summary = event.get('summary', 'No Title')
+
+            buf.write(
+                _white(f"Title: {summary}") + "\n"
+                + _white(f"Start: {start} {timezone}") + "\n"
+                + _white(f"ID: {event['id']}") + "\n"
+                + _white(f"Creator: {creator}") + "\n"
+                + _white(f"Attendees: {total_attendees}") + "\n"
+                + _SEPARATOR + "\n"
+            )
+
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+
     def get_event_details(self, event_id):
         """Get detailed information about a specific event
         
@@ -92,26 +219,57 @@ class CalendarManager:
         try:
             event = self.service.events().get(
                 calendarId='primary', 
-                eventId=event_id
+                eventId=event_id,
+                fields=EVENT_DETAIL_FIELDS
             ).execute()
-
-            print_color("\nEvent Details:", color="cyan")
-            print_color(f"Summary: {event.get('summary', 'No Title')}", color="white")
-            print_color(f"Start: {event['start'].get('dateTime', event['start'].get('date'))}", color="white")
-            print_color(f"End: {event['end'].get('dateTime', event['end'].get('date'))}", color="white")
-            print_color(f"Location: {event.get('location', 'No location')}", color="white")
-            print_color(f"Description: {event.get('description', 'No description')}", color="white")
-            
-            if 'attendees' in event:
-                print_color("\nAttendees:", color="cyan")
-                for attendee in event['attendees']:
-                    response = attendee.get('responseStatus', 'No response')
-                    email = attendee.get('email', 'No email')
-                    print_color(f"- {email} (Response: {response})", color="white")
+            self._print_event_details(event)
 
         except HttpError as error:
             print_color(f"Error getting event details: {error}", color="red")
 
+    def batch_get_details(self, event_ids):
+        """Get detailed information about several events using batched requests
+        
+        Args:
+            event_ids (list): IDs of the events to retrieve
+        """
+        if not self.service:
+            raise ValueError("Service not initialized")
+
+        def on_event(request_id, response, exception):
+            if exception is not None:
+                print_color(f"Error getting event details for {request_id}: {exception}", color="red")
+            else:
+                self._print_event_details(response)
+
+        requests = (
+            (event_id, self.service.events().get(calendarId='primary', eventId=event_id, fields=EVENT_DETAIL_FIELDS))
+            for event_id in event_ids
+        )
+        execute_batch(self.service, requests, on_event)
+
+    def _print_event_details(self, event):
+        """Print the details of a single event with a single write"""
+        lines = [
+            _cyan("\nEvent Details:"),
+            _white(f"Summary: {event.get('summary', 'No Title')}"),
+            _white(f"Start: {event['start'].get('dateTime', event['start'].get('date'))}"),
+            _white(f"End: {event['end'].get('dateTime', event['end'].get('date'))}"),
+            _white(f"Location: {event.get('location', 'No location')}"),
+            _white(f"Description: {event.get('description', 'No description')}"),
+        ]
+        
+        if 'attendees' in event:
+            lines.append(_cyan("\nAttendees:"))
+            for attendee in event['attendees']:
+                response = attendee.get('responseStatus', 'No response')
+                email = attendee.get('email', 'No email')
+                lines.append(_white(f"- {email} (Response: {response})"))
+
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
+        sys.stdout.flush()
+
     def create_phishing_event(self, config_path):
         """Create a phishing calendar event from YAML configuration"""
         if not self.service:
@@ -119,14 +277,15 @@ class CalendarManager:
 
         try:
             # Load and validate configuration
-            with open(config_path, 'r') as file:
-                config = yaml.safe_load(file)
+            config = _load_event_config(config_path, os.path.getmtime(config_path))
 
             # Debug output for configuration
             print_color(f"\nLoaded configuration: {config_path}", color="cyan")
 
-            event_config = config['event']
+            event_config = validate_event_config(config)
             send_notifications = event_config.get('send_notifications', True)
+            timezone = event_config.get('timezone', 'UTC')
+            conference_solution = event_config.get('conference_solution')
             
             # Build event object with required fields
             event = {
@@ -138,23 +297,23 @@ class CalendarManager:
             if 'start_time' in event_config:
                 event['start'] = {
                     'dateTime': event_config['start_time'],
-                    'timeZone': event_config.get('timezone', 'UTC')
+                    'timeZone': timezone
                 }
                 
             if 'end_time' in event_config:
                 event['end'] = {
                     'dateTime': event_config['end_time'],
-                    'timeZone': event_config.get('timezone', 'UTC')
+                    'timeZone': timezone
                 }
                 
             if 'location' in event_config:
                 event['location'] = event_config['location']
                 
-            if 'attendees' in event_config:
-                event['attendees'] = [{'email': email} for email in event_config['attendees']]
+            attendee_emails = event_config.get('attendees') or []
+            if attendee_emails:
+                event['attendees'] = [{'email': email} for email in attendee_emails]
                 print_color(f"\nConfigured attendees:", color="cyan")
-                for attendee in event['attendees']:
-                    print_color(f"  - {attendee['email']}", color="white")
+                sys.stdout.write("".join(_white(f"  - {email}") + "\n" for email in attendee_emails))
                 
             if 'reminder_minutes' in event_config or 'popup_minutes' in event_config:
                 event['reminders'] = {
@@ -173,12 +332,12 @@ class CalendarManager:
                     })
 
             # Add conference details if specified
-            if 'conference_solution' in event_config:
+            if conference_solution:
                 event['conferenceData'] = {
                     'createRequest': {
-                        'requestId': f"meet-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+                        'requestId': uuid.uuid4().hex,
                         'conferenceSolutionKey': {
-                            'type': event_config['conference_solution']
+                            'type': conference_solution
                         }
                     }
                 }
@@ -193,7 +352,7 @@ class CalendarManager:
                 calendarId='primary',
                 body=event,
                 sendUpdates='all' if send_notifications else 'none',
-                conferenceDataVersion=1 if event_config.get('conference_solution') else 0
+                conferenceDataVersion=1 if conference_solution else 0
             ).execute()
 
             print_color("\nEvent created successfully", color="green")
@@ -201,20 +360,15 @@ class CalendarManager:
             print_color(f"ID: {result.get('id')}", color="white")
             if 'hangoutLink' in result:
                 print_color(f"Meet Link: {result.get('hangoutLink')}", color="white")
-            if 'attendees' in event:
-                print_color(f"Added {len(event['attendees'])} attendee(s)", color="white")
+            if attendee_emails:
+                print_color(f"Added {len(attendee_emails)} attendee(s)", color="white")
                 print_color("Attendees:", color="white")
-                for attendee in event['attendees']:
-                    print_color(f"-> {attendee['email']}", color="white")
+                sys.stdout.write("".join(_white(f"-> {email}") + "\n" for email in attendee_emails))
             print_color(f"Email notifications: {'enabled' if send_notifications else 'disabled'}", color="white")
             print_color("-" * 50, color="blue")
 
             return result
 
-        except Exception as e:
-            print_color(f"Error creating event: {str(e)}", color="red")
-            raise
-
         except FileNotFoundError:
             print_color(f"Configuration file not found: {config_path}", color="red")
             raise
@@ -247,4 +401,25 @@ class CalendarManager:
             print_color(f"Event ID: {event_id}", color="white")
 
         except HttpError as error:
-            print_color(f"Error deleting event: {error}", color="red")
\ No newline at end of file
+            print_color(f"Error deleting event: {error}", color="red")
+
+    def batch_delete_events(self, event_ids):
+        """Delete several events using batched requests
+        
+        Args:
+            event_ids (list): IDs of the events to delete
+        """
+        if not self.service:
+            raise ValueError("Service not initialized")
+
+        def on_delete(request_id, response, exception):
+            if exception is not None:
+                print_color(f"Error deleting event {request_id}: {exception}", color="red")
+            else:
+                print_color(f"✓ Event deleted successfully: {request_id}", color="green")
+
+        requests = (
+            (event_id, self.service.events().delete(calendarId='primary', eventId=event_id))
+            for event_id in event_ids
+        )
+        execute_batch(self.service, requests, on_delete)
@@ -1,26 +1,102 @@
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.auth.exceptions import RefreshError
 from googleapiclient.http import MediaIoBaseDownload
 from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import Request, AuthorizedSession
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from delepwn.utils.output import print_color
-import google.auth
-import io
+from delepwn.utils.api import authorized_http, execute_batch, handle_api_ratelimit, build_service
+from delepwn.config.settings import (
+    ensure_dir, DOWNLOADS_DIR, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_PROGRESS_STEP, DOWNLOAD_WORKERS,
+    DOWNLOAD_RANGE_WORKERS, DEFAULT_REQUEST_TIMEOUT, API_RETRY_STATUS_CODES
+)
 import csv
 import os
+import sys
+import contextlib
+import copy
+import types
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+# Cached tokens are refreshed when they expire within this margin
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=60)
+
+
+def _utcnow():
+    """Current UTC time as a naive datetime, the form google-auth uses for expiry"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+# Parent IDs combined into one "'a' in parents or 'b' in parents ..." query
+FOLDER_QUERY_PARENTS = 50
+# Largest page files().list accepts, the default is 100
+LIST_PAGE_SIZE = 1000
+# Parent chunks of one tree level listed concurrently
+FOLDER_WALK_WORKERS = 8
+# Permission writes per batch, Drive throttles sharing well below the 100 a batch allows
+SHARE_BATCH_SIZE = 10
+# Partial response for folder listings, trashed is implied by the trashed=false query
+FOLDER_LISTING_FIELDS = 'nextPageToken, files(id, name, mimeType, size)'
+# MIME type prefix of Google Docs Editors files, which must be exported rather than downloaded
+GAPPS_PREFIX = 'application/vnd.google-apps.'
+# Export formats for Google Docs Editors files
+_GAPPS_EXPORT_MIME = types.MappingProxyType({
+    'application/vnd.google-apps.document': 'application/pdf',
+    'application/vnd.google-apps.spreadsheet': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.google-apps.presentation': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    'application/vnd.google-apps.drawing': 'application/pdf',
+    'application/vnd.google-apps.script': 'application/json',
+    'application/vnd.google-apps.form': 'application/pdf',
+    'application/vnd.google-apps.site': 'text/plain',
+})
+_EXPORT_EXTENSION = types.MappingProxyType({
+    'application/pdf': '.pdf',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': '.pptx',
+    'application/json': '.json',
+    'text/plain': '.txt',
+})
+_GAPPS_EXTENSION = types.MappingProxyType({
+    'application/vnd.google-apps.document': '.gdoc',
+    'application/vnd.google-apps.spreadsheet': '.gsheet',
+    'application/vnd.google-apps.presentation': '.gslides',
+    'application/vnd.google-apps.drawing': '.gdraw',
+})
+MEDIA_URL = 'https://www.googleapis.com/drive/v3/files/{}?alt=media'
+# Seconds folder listings and trees are reused within a session
+FOLDER_CACHE_TTL = 60
+
 
 class DriveManager:
     """Class to manage Google Drive operations with domain-wide delegation"""
     
-    def __init__(self, service_account_file):
+    def __init__(self, service_account_file, chunksize=DOWNLOAD_CHUNK_SIZE):
         if not service_account_file:
             raise ValueError("Service account file path is required")
         self.SERVICE_ACCOUNT_FILE = service_account_file
+        self.chunksize = chunksize  # bytes fetched per download request
         self.SCOPES = ['https://www.googleapis.com/auth/drive']
         self.service = None
         self.current_credentials = None
+        # Parse the key once; delegated credentials are cached per impersonated user
+        self._base_credentials = service_account.Credentials.from_service_account_file(
+            self.SERVICE_ACCOUNT_FILE,
+            scopes=self.SCOPES
+        )
+        self._delegated_credentials = {}
+        # One transport for all token exchanges, its session keeps the token endpoint connection alive
+        self._token_request = Request()
+        # Guards the credentials cache, get_access_token may be called from worker threads
+        self._token_lock = threading.RLock()
+        # key -> (timestamp, value, folder IDs the value covers)
+        self._folder_cache = {}
+        self._media_session = None
     
     def get_access_token(self, impersonate_email):
         """Create and return an access token for the impersonated user
@@ -31,21 +107,20 @@ class DriveManager:
         Returns:
             str: Access token
         """
-        if not self.SERVICE_ACCOUNT_FILE:
-            raise ValueError("Service account file path is not set")
-            
-        credentials = service_account.Credentials.from_service_account_file(
-            self.SERVICE_ACCOUNT_FILE,
-            scopes=self.SCOPES
-        )
-        
         if not impersonate_email:
             raise ValueError("Impersonation email is required")
             
-        delegated_credentials = credentials.with_subject(impersonate_email)
-        request = Request()
-        delegated_credentials.refresh(request)
-        return delegated_credentials.token
+        with self._token_lock:
+            delegated_credentials = self._delegated_credentials.get(impersonate_email)
+            if delegated_credentials is None:
+                delegated_credentials = self._base_credentials.with_subject(impersonate_email)
+                self._delegated_credentials[impersonate_email] = delegated_credentials
+
+            # Reuse the cached token unless it is about to expire
+            expiry = delegated_credentials.expiry
+            if not delegated_credentials.token or expiry is None or expiry - _utcnow() <= TOKEN_EXPIRY_MARGIN:
+                delegated_credentials.refresh(self._token_request)
+            return delegated_credentials.token
 
     def initialize_service(self, token):
         """Initialize the Drive service with the given token
@@ -57,16 +132,46 @@ class DriveManager:
             raise ValueError("Token is required to initialize service")
             
         self.current_credentials = Credentials(token=token)
-        self.service = build("drive", "v3", credentials=self.current_credentials)
+        # The discovery document is parsed once per process and shared across users, requests
+        # go over the thread's pooled connection instead of a new one per service
+        self.service = build_service("drive", "v3", http=authorized_http(self.current_credentials))
+        with self._token_lock:
+            if self._media_session is not None:
+                self._media_session.close()
+                self._media_session = None
+        # Cached listings belong to the previous user
+        self._folder_cache.clear()
+
+    def _cache_get(self, key):
+        """Return the cached value for key, or None when missing or older than FOLDER_CACHE_TTL"""
+        entry = self._folder_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > FOLDER_CACHE_TTL:
+            del self._folder_cache[key]
+            return None
+        return entry[1]
+
+    def _cache_put(self, key, value, folder_ids):
+        """Cache value under key, remembering which folders it was built from"""
+        self._folder_cache[key] = (time.monotonic(), value, frozenset(folder_ids))
 
-    def download_file(self, file_id):
+    def _invalidate_folders(self, folder_ids):
+        """Drop every cached value covering one of folder_ids"""
+        folder_ids = set(folder_ids)
+        for key in [key for key, entry in self._folder_cache.items() if not entry[2].isdisjoint(folder_ids)]:
+            del self._folder_cache[key]
+
+    def download_file(self, file_id, metadata=None):
         """Download a file from Google Drive
         
         Args:
             file_id: ID of the file to download
+            metadata (dict, optional): The file's name, mimeType and size from an earlier
+                listing, skips the metadata request
                 
         Returns:
-            tuple: (file_name, file_content) or (None, None) if error occurs
+            tuple: (file_name, file_path) or (None, None) if error occurs
         """
         if not self.service:
             raise ValueError("Service not initialized. Call initialize_service first.")
@@ -75,11 +180,13 @@ class DriveManager:
             raise ValueError("File ID is required")
 
         try:
-            # Get file metadata
-            file_metadata = self.service.files().get(
-                fileId=file_id, 
-                fields='name, mimeType, size'
-            ).execute()
+            # Get file metadata unless the caller already has it
+            file_metadata = metadata
+            if not file_metadata or 'name' not in file_metadata or 'mimeType' not in file_metadata:
+                file_metadata = self._execute(self.service.files().get(
+                    fileId=file_id, 
+                    fields='name, mimeType, size'
+                ))
             
             print_color(f"\nDownloading file: {file_metadata.get('name')}", color="cyan")
             file_name = file_metadata.get('name')
@@ -89,19 +196,9 @@ class DriveManager:
             print_color(f"File type: {mime_type}", color="cyan")
             print_color(f"File size: {file_size} bytes", color="cyan")
             
-            file = io.BytesIO()
-
-            if mime_type.startswith('application/vnd.google-apps.'):
+            if mime_type.startswith(GAPPS_PREFIX):
                 # Handle Google Docs Editors files
-                export_mime_type = {
-                    'application/vnd.google-apps.document': 'application/pdf',
-                    'application/vnd.google-apps.spreadsheet': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    'application/vnd.google-apps.presentation': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
-                    'application/vnd.google-apps.drawing': 'application/pdf',
-                    'application/vnd.google-apps.script': 'application/json',
-                    'application/vnd.google-apps.form': 'application/pdf',
-                    'application/vnd.google-apps.site': 'text/plain',
-                }.get(mime_type)
+                export_mime_type = _GAPPS_EXPORT_MIME.get(mime_type)
                 
                 if not export_mime_type:
                     print_color(f"Warning: Unsupported Google Workspace file type: {mime_type}", color="yellow")
@@ -112,13 +209,7 @@ class DriveManager:
                     mimeType=export_mime_type
                 )
                 
-                file_extension = {
-                    'application/pdf': '.pdf',
-                    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx',
-                    'application/vnd.openxmlformats-officedocument.presentationml.presentation': '.pptx',
-                    'application/json': '.json',
-                    'text/plain': '.txt'
-                }.get(export_mime_type, '.pdf')
+                file_extension = _EXPORT_EXTENSION.get(export_mime_type, '.pdf')
                 
                 if not file_name.endswith(file_extension):
                     file_name += file_extension
@@ -126,36 +217,35 @@ class DriveManager:
                 # Handle binary files
                 request = self.service.files().get_media(fileId=file_id)
 
-            downloader = MediaIoBaseDownload(file, request)
-            
-            done = False
-            last_progress = 0
-            
-            while not done:
-                status, done = downloader.next_chunk()
-                if status:
-                    progress = int(status.progress() * 100)
-                    if progress - last_progress >= 10:  # Update every 10%
-                        print_color(f"Download progress: {progress}%", color="blue")
-                        last_progress = progress
-
-            if file.getvalue():
-                # Create a downloads directory if it doesn't exist
-                os.makedirs('downloads', exist_ok=True)
-                file_path = os.path.join('downloads', file_name)
-                
-                # Check if file already exists and handle naming
-                counter = 1
-                base_name, extension = os.path.splitext(file_path)
-                while os.path.exists(file_path):
-                    file_path = f"{base_name}_{counter}{extension}"
-                    counter += 1
-                
-                with open(file_path, 'wb') as f:
-                    f.write(file.getvalue())
+            # The downloader uses the request's connection, give it this thread's own
+            request.http = authorized_http(self.current_credentials)
+
+            # Reserve a free name, the placeholder is replaced once the download completed
+            file_path = self._reserve_path(os.path.join(ensure_dir(DOWNLOADS_DIR), file_name))
+
+            # Stream chunks straight to disk, the final name only appears once the download completed
+            part_path = file_path + '.part'
+            total_size = int(file_metadata['size']) if 'size' in file_metadata else 0
+            try:
+                # Docs Editors files report a size too but can only be exported, never fetched by range
+                is_binary = not mime_type.startswith(GAPPS_PREFIX)
+                if is_binary and total_size > self.chunksize and hasattr(os, 'pwrite'):
+                    # Binary files of known size: fetch byte ranges over parallel connections
+                    received = self._download_ranges(file_id, total_size, part_path)
+                else:
+                    received = self._download_sequential(request, part_path)
+            except BaseException:
+                self._remove_partial(part_path)
+                self._remove_partial(file_path)
+                raise
+
+            if received:
+                os.replace(part_path, file_path)
                 print_color(f'\n✓ File downloaded successfully as: {file_path}', color="green")
-                return file_name, file.getvalue()
+                return file_name, file_path
             
+            self._remove_partial(part_path)
+            self._remove_partial(file_path)
             print_color("× No data received for download", color="red")
             return None, None
 
@@ -171,6 +261,146 @@ class DriveManager:
             print_color(f"× Unexpected error while downloading: {str(e)}", color="red")
             return None, None
 
+    def _download_sequential(self, request, part_path):
+        """Stream a media request to part_path chunk by chunk
+        
+        Returns:
+            int: Number of bytes written
+        """
+        with open(part_path, 'wb') as file:
+            downloader = MediaIoBaseDownload(file, request, chunksize=self.chunksize)
+            
+            done = False
+            last_reported = 0
+            
+            while not done:
+                status, done = downloader.next_chunk()
+                # Report by bytes: exports have no known total size, and large chunks make few updates
+                if status and status.resumable_progress - last_reported >= DOWNLOAD_PROGRESS_STEP:
+                    last_reported = status.resumable_progress
+                    downloaded_mib = last_reported / (1024 * 1024)
+                    if status.total_size:
+                        print_color(f"Download progress: {int(status.progress() * 100)}% ({downloaded_mib:.0f} MiB)", color="blue")
+                    else:
+                        print_color(f"Download progress: {downloaded_mib:.0f} MiB", color="blue")
+            return file.tell()
+
+    @property
+    def media_session(self):
+        """Authorized requests session for ranged media downloads
+        
+        Pooled for the range workers and reused across files, transient errors are retried.
+        Created under the token lock, concurrent downloads must not each build their own.
+        """
+        with self._token_lock:
+            if self._media_session is None:
+                session = AuthorizedSession(self.current_credentials)
+                retry = Retry(total=3, backoff_factor=0.3, status_forcelist=sorted(API_RETRY_STATUS_CODES))
+                # download_files runs DOWNLOAD_WORKERS files at once, each with its own range workers
+                adapter = HTTPAdapter(pool_connections=DOWNLOAD_RANGE_WORKERS,
+                                      pool_maxsize=DOWNLOAD_WORKERS * DOWNLOAD_RANGE_WORKERS,
+                                      max_retries=retry)
+                session.mount('https://', adapter)
+                self._media_session = session
+            return self._media_session
+
+    def _download_ranges(self, file_id, total_size, part_path):
+        """Fetch a binary file as chunksize byte ranges over parallel connections
+        
+        Each range is written at its own offset with os.pwrite, so memory stays
+        bounded by the streamed blocks regardless of file size.
+        
+        Returns:
+            int: Number of bytes written
+        """
+        url = MEDIA_URL.format(file_id)
+        ranges = [(start, min(start + self.chunksize, total_size) - 1)
+                  for start in range(0, total_size, self.chunksize)]
+        lock = threading.Lock()
+        progress = {'done': 0, 'reported': 0}
+        # Resolved once here rather than by every range worker
+        session = self.media_session
+
+        def fetch_range(byte_range):
+            start, end = byte_range
+            response = session.get(
+                url, headers={'Range': f'bytes={start}-{end}'}, stream=True, timeout=DEFAULT_REQUEST_TIMEOUT
+            )
+            with response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise ValueError("Server ignored the byte range request")
+                offset = start
+                for block in response.iter_content(chunk_size=1024 * 1024):
+                    os.pwrite(fd, block, offset)
+                    offset += len(block)
+            if offset != end + 1:
+                raise OSError(f"Incomplete range {start}-{end}: received {offset - start} bytes")
+            with lock:
+                progress['done'] += end + 1 - start
+                if progress['done'] - progress['reported'] >= DOWNLOAD_PROGRESS_STEP:
+                    progress['reported'] = progress['done']
+                    print_color(f"Download progress: {progress['done'] * 100 // total_size}% "
+                                f"({progress['done'] / (1024 * 1024):.0f} MiB)", color="blue")
+
+        fd = os.open(part_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, total_size)
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_RANGE_WORKERS) as executor:
+                # list() surfaces the first failed range
+                list(executor.map(fetch_range, ranges))
+        finally:
+            os.close(fd)
+        return total_size
+
+    def download_files(self, file_ids, max_workers=DOWNLOAD_WORKERS):
+        """Download several files concurrently
+        
+        Args:
+            file_ids (list): IDs of the files to download
+            max_workers (int, optional): Files downloaded in parallel
+            
+        Returns:
+            list: (file_name, file_path) tuples in the order of file_ids, (None, None) for failures
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.download_file, file_ids))
+
+    @staticmethod
+    def _reserve_path(file_path):
+        """Create an empty file at the first free name among file_path, name_1.ext, name_2.ext, ...
+        
+        Names are claimed with O_EXCL, so concurrent downloads never pick the same one.
+        
+        Returns:
+            str: The reserved path
+        """
+        base_name, extension = os.path.splitext(file_path)
+        candidate = file_path
+        existing = None
+        counter = 1
+        while True:
+            try:
+                os.close(os.open(candidate, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                return candidate
+            except FileExistsError:
+                if existing is None:
+                    # One directory listing instead of probing each taken name
+                    existing = set(os.listdir(os.path.dirname(file_path) or '.'))
+                candidate = f"{base_name}_{counter}{extension}"
+                counter += 1
+                while os.path.basename(candidate) in existing:
+                    candidate = f"{base_name}_{counter}{extension}"
+                    counter += 1
+
+    @staticmethod
+    def _remove_partial(path):
+        """Remove an incomplete download, if it is still there"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
     def get_file_extension(self, mime_type):
         """Return the file extension based on the mime type
         
@@ -180,16 +410,12 @@ class DriveManager:
         Returns:
             str: File extension
         """
-        mime_type_to_extension = {
-            'application/vnd.google-apps.document': '.gdoc',
-            'application/vnd.google-apps.spreadsheet': '.gsheet',
-            'application/vnd.google-apps.presentation': '.gslides',
-            'application/vnd.google-apps.drawing': '.gdraw',
-        }
-        return mime_type_to_extension.get(mime_type, '')
+        return _GAPPS_EXTENSION.get(mime_type, '')
 
     def write_to_csv(self, file_data, csv_filename='files.csv'):
-        """Write file data to a CSV file
+        """Append a single row of file data to a CSV file
+        
+        The file is opened and closed on every call, use open_csv() to write many rows.
         
         Args:
             file_data: List of file data to write
@@ -202,21 +428,47 @@ class DriveManager:
             writer = csv.writer(csv_file)
             writer.writerow(file_data)
 
-    def list_files(self, output_file=None, folder_id=None):
+    @staticmethod
+    @contextlib.contextmanager
+    def open_csv(csv_filename, header=None):
+        """Open a CSV file once for a whole listing
+        
+        Args:
+            csv_filename: Name of the CSV file, truncated if it exists
+            header (list, optional): Row written first
+            
+        Yields:
+            csv.writer: Writer bound to the open file, flushed and closed on exit
+        """
+        # Large buffer: listings of big drives produce tens of thousands of rows
+        with open(csv_filename, mode='w', newline='', encoding='utf-8', buffering=1 << 20) as csv_file:
+            writer = csv.writer(csv_file)
+            if header:
+                writer.writerow(header)
+            yield writer
+
+    def list_files(self, writer=None, folder_id=None):
         """List files in Google Drive
         
         Args:
-            output_file: Optional file to write results to
-            folder_id: Optional folder ID to list files from
+            writer: Optional csv.writer to stream rows to
+            folder_id: Optional folder ID, or list of IDs, to list files from
             
         Returns:
-            list: List of files if no output_file specified
+            list: List of files if no writer specified
         """
         if not self.service:
             raise ValueError("Service not initialized. Call initialize_service first.")
 
         try:
             all_files = []
+            if isinstance(folder_id, (list, tuple)):
+                if len(folder_id) > 1:
+                    listings = self.batch_list_folders(folder_id)
+                    items = [item for fid in folder_id for item in listings.get(fid, [])]
+                    self._print_files(items)
+                    return items
+                folder_id = folder_id[0] if folder_id else None
             if folder_id:
                 return self._list_files_in_folder(folder_id)
 
@@ -226,23 +478,22 @@ class DriveManager:
                     q="trashed=false",
                     spaces='drive',
                     fields='nextPageToken, files(id, name, size, mimeType)',
+                    pageSize=LIST_PAGE_SIZE,
                     pageToken=page_token
                 ).execute()
 
                 files = response.get('files', [])
+                rows = []
+                lines = []
                 for file in files:
                     file_name = file.get('name')
                     file_id = file.get('id')
                     file_size = file.get('size', 'N/A')
                     mime_type = file.get('mimeType')
-                    file_extension = self.get_file_extension(mime_type)
                     file_trashed = file.get('trashed', False)
 
-                    if output_file:
-                        self.write_to_csv(
-                            [file_name, file_id, file_size, file_trashed, mime_type],
-                            output_file
-                        )
+                    if writer:
+                        rows.append([file_name, file_id, file_size, file_trashed, mime_type])
                     else:
                         all_files.append({
                             'name': file_name,
@@ -251,14 +502,20 @@ class DriveManager:
                             'mime_type': mime_type,
                             'trashed': file_trashed
                         })
-                        print(f"Name: {file_name}, ID: {file_id}, Size: {file_size}, "
-                              f"Extension: {mime_type}, Trashed: {file_trashed}")
+                        lines.append(f"Name: {file_name}, ID: {file_id}, Size: {file_size}, "
+                                     f"Extension: {mime_type}, Trashed: {file_trashed}\n")
+
+                # One write call per page instead of one per file
+                if rows:
+                    writer.writerows(rows)
+                if lines:
+                    sys.stdout.write(''.join(lines))
 
                 page_token = response.get('nextPageToken')
                 if not page_token:
                     break
 
-            return all_files if not output_file else None
+            return all_files if not writer else None
 
         except HttpError as error:
             print(f"An error occurred: {error}")
@@ -267,11 +524,22 @@ class DriveManager:
             print("[*] Token refresh required")
             raise
 
-    def _list_files_in_folder(self, folder_id):
+    @staticmethod
+    def _print_files(files):
+        """Print one line per file with a single write"""
+        sys.stdout.write(''.join(
+            f"Name: {file.get('name')}, ID: {file.get('id')}, Size: {file.get('size', 'N/A')}, "
+            f"Extension: {file.get('mimeType')}\n"
+            for file in files
+        ))
+        sys.stdout.flush()
+
+    def _list_files_in_folder(self, folder_id, fields=FOLDER_LISTING_FIELDS):
         """List files in a specific folder
         
         Args:
             folder_id: ID of the folder
+            fields (str, optional): Partial response selector, must include nextPageToken
             
         Returns:
             list: List of files in the folder
@@ -281,14 +549,21 @@ class DriveManager:
             
         query = f"'{folder_id}' in parents and trashed=false"
         try:
-            results = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='nextPageToken, files(id, name, mimeType, size, trashed)',
-                pageSize=100
-            ).execute()
-            items = results.get('files', [])
-            print(items)
+            items = []
+            page_token = None
+            while True:
+                results = self.service.files().list(
+                    q=query,
+                    spaces='drive',
+                    fields=fields,
+                    pageSize=LIST_PAGE_SIZE,
+                    pageToken=page_token
+                ).execute()
+                items.extend(results.get('files', []))
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
+            self._print_files(items)
             return items
         except HttpError as error:
             print(f"An error occurred: {error}")
@@ -297,6 +572,52 @@ class DriveManager:
             print("[*] Token refresh required")
             raise
 
+    def batch_list_folders(self, folder_ids, fields=FOLDER_LISTING_FIELDS):
+        """List the contents of several folders through batched requests
+        
+        The first page of every folder is fetched in one batch, up to 100 folders
+        per HTTP call; only folders with more files page on their own afterwards.
+        
+        Args:
+            folder_ids (list): IDs of the folders to list
+            fields (str, optional): Partial response selector, must include nextPageToken
+            
+        Returns:
+            dict: Files keyed by folder ID, folders that failed to list are left out
+        """
+        folder_ids = list(dict.fromkeys(folder_ids))
+        files = self.service.files()
+        requests = {
+            str(index): files.list(
+                q=f"'{folder_id}' in parents and trashed=false",
+                spaces='drive',
+                fields=fields,
+                pageSize=LIST_PAGE_SIZE
+            )
+            for index, folder_id in enumerate(folder_ids)
+        }
+        listings = {}
+        next_pages = []
+
+        def on_list(request_id, response, exception):
+            folder_id = folder_ids[int(request_id)]
+            if exception is not None:
+                print_color(f"× Error listing folder {folder_id}: {str(exception)}", color="red")
+                return
+            listings[folder_id] = response.get('files', [])
+            next_request = files.list_next(requests[request_id], response)
+            if next_request is not None:
+                next_pages.append((folder_id, next_request))
+
+        execute_batch(self.service, requests.items(), on_list)
+
+        for folder_id, request in next_pages:
+            while request is not None:
+                response = self._execute(request)
+                listings[folder_id].extend(response.get('files', []))
+                request = files.list_next(request, response)
+        return listings
+
     def share_folder(self, folder_id, user_email, role='reader'):
         """Share a single folder with a user"""
         try:
@@ -311,9 +632,10 @@ class DriveManager:
                 body=permission,
                 sendNotificationEmail=False,
                 fields='id'
-            ).execute()
+            ).execute(http=authorized_http(self.current_credentials))
             
             if result and 'id' in result:
+                self._invalidate_folders([folder_id])
                 print_color(f"✓ Shared folder {folder_id} with {user_email}", color="green")
                 return True
                 
@@ -324,17 +646,8 @@ class DriveManager:
     def share_subfolders(self, parent_id, user_email, role='reader'):
         """Share all subfolders under a parent folder"""
         try:
-            query = f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder'"
-            results = self.service.files().list(
-                q=query,
-                fields='files(id, name)'
-            ).execute()
-            
-            for folder in results.get('files', []):
-                self.share_folder(folder['id'], user_email, role)
-                # Recursively share subfolders
-                self.share_subfolders(folder['id'], user_email, role)
-                
+            subfolder_ids = [folder['id'] for _, folder in self._walk_folders([parent_id])]
+            self.share_folders_batch(((folder_id, user_email) for folder_id in subfolder_ids), role=role)
         except Exception as e:
             print_color(f"× Error sharing subfolders of {parent_id}: {str(e)}", color="red")
 
@@ -366,6 +679,7 @@ class DriveManager:
             ).execute()
             
             if result and 'id' in result:
+                self._invalidate_folders([folder_id])
                 print_color(f"✓ Shared folder {folder_id} with {target_email}", color="green")
                 return True
                 
@@ -383,23 +697,119 @@ class DriveManager:
             
         return False
 
+    def _walk_folders(self, root_ids, depth=None):
+        """Walk the folder tree below root_ids breadth-first, one query per level and chunk of parents
+        
+        Args:
+            root_ids (list): IDs of the folders to start from
+            depth (int, optional): Number of levels to descend. None for unlimited
+            
+        Yields:
+            tuple: (parent_id, folder) for every subfolder, each folder once
+        """
+        seen = set(root_ids)
+        level = list(root_ids)
+        current_depth = 0
+        with ThreadPoolExecutor(max_workers=FOLDER_WALK_WORKERS) as executor:
+            while level and (depth is None or current_depth < depth):
+                next_level = []
+                chunks = [level[start:start + FOLDER_QUERY_PARENTS]
+                          for start in range(0, len(level), FOLDER_QUERY_PARENTS)]
+                # Chunks of a level are independent, list them concurrently and consume in order
+                for chunk, folders in zip(chunks, executor.map(self._list_child_folders, chunks)):
+                    chunk_ids = set(chunk)
+                    for folder in folders:
+                        if folder['id'] in seen:
+                            continue
+                        seen.add(folder['id'])
+                        if len(chunk) == 1:
+                            # Also covers aliases such as 'root', which parents never contains
+                            parent_id = chunk[0]
+                        else:
+                            parent_id = next((p for p in folder.get('parents', []) if p in chunk_ids), chunk[0])
+                        next_level.append(folder['id'])
+                        yield parent_id, folder
+                level = next_level
+                current_depth += 1
+
+    def _list_child_folders(self, parent_ids):
+        """Return every folder directly below one of parent_ids, following nextPageToken"""
+        parents_query = ' or '.join(f"'{parent_id}' in parents" for parent_id in parent_ids)
+        files = self.service.files()
+        request = files.list(
+            q=f"mimeType='{FOLDER_MIME_TYPE}' and trashed=false and ({parents_query})",
+            fields='nextPageToken, files(id, name, parents)',
+            pageSize=LIST_PAGE_SIZE
+        )
+        folders = []
+        while request is not None:
+            response = self._execute(request)
+            folders.extend(response.get('files', []))
+            request = files.list_next(request, response)
+        return folders
+
+    @handle_api_ratelimit
+    def _execute(self, request):
+        """Execute a request on the calling thread's own connection, retried when rate limited"""
+        return request.execute(http=authorized_http(self.current_credentials))
+
+    def share_folders_batch(self, pairs, role='reader'):
+        """Share folders using batched requests, SHARE_BATCH_SIZE permission writes per HTTP call
+        
+        Writes rejected by rate limiting are retried with backoff by execute_batch.
+        
+        Args:
+            pairs: Iterable of (folder_id, user_email) tuples
+            role (str, optional): Permission role. Defaults to 'reader'
+            
+        Returns:
+            int: Number of folders shared successfully
+        """
+        pairs = list(pairs)
+        shared = 0
+        shared_ids = set()
+
+        def on_share(request_id, response, exception):
+            nonlocal shared
+            folder_id, user_email = pairs[int(request_id)]
+            if exception is not None:
+                print_color(f"× Error sharing folder {folder_id}: {str(exception)}", color="red")
+            elif response and 'id' in response:
+                print_color(f"✓ Shared folder {folder_id} with {user_email}", color="green")
+                shared_ids.add(folder_id)
+                shared += 1
+
+        permissions = self.service.permissions()
+        requests = (
+            (str(index), permissions.create(
+                fileId=folder_id,
+                body={'type': 'user', 'role': role, 'emailAddress': user_email},
+                sendNotificationEmail=False,
+                fields='id'
+            ))
+            for index, (folder_id, user_email) in enumerate(pairs)
+        )
+        execute_batch(self.service, requests, on_share, batch_size=SHARE_BATCH_SIZE)
+        self._invalidate_folders(shared_ids)
+        if shared < len(pairs):
+            print_color(f"× Shared {shared} of {len(pairs)} folders, see the errors above", color="red")
+        return shared
+
     def share_all_folders(self, target_users, include_subfolders=True):
-        """Share all accessible folders with target users as viewers"""
+        """Share all accessible folders with target users as viewers
+        
+        Every accessible folder, subfolders included, is listed up front, then each
+        (folder, user) pair is shared once through batched requests. include_subfolders
+        is kept for compatibility, the full listing already covers every subfolder.
+        """
         try:
-            folders = self.list_all_folders()
-            for folder in folders:
-                for user in target_users:
-                    self.share_folder(
-                        folder_id=folder['id'],
-                        user_email=user,
-                        role='reader'  # Changed from 'writer' to 'reader'
-                    )
-                    if include_subfolders:
-                        self.share_subfolders(
-                            parent_id=folder['id'],
-                            user_email=user,
-                            role='reader'  # Changed from 'writer' to 'reader'
-                        )
+            # No tree walk needed, it would only list folders that are already here
+            folder_ids = list(dict.fromkeys(folder['id'] for folder in self.list_all_folders()))
+
+            self.share_folders_batch(
+                ((folder_id, user) for folder_id in folder_ids for user in target_users),
+                role='reader'
+            )
         except Exception as e:
             print_color(f"Error sharing folders: {str(e)}", color="red")
             raise
@@ -412,42 +822,49 @@ class DriveManager:
             depth (int, optional): Maximum depth to traverse. None for unlimited
             
         Returns:
-            dict: Tree structure of folders
+            dict: Tree structure of folders, a copy the caller may modify
         """
+        key = ('tree', folder_id, depth)
+        tree = self._cache_get(key)
+        if tree is not None:
+            return copy.deepcopy(tree)
         try:
-            query = f"mimeType='application/vnd.google-apps.folder' and '{folder_id}' in parents"
-            response = self.service.files().list(
-                q=query,
-                fields='files(id, name)'
-            ).execute()
-            
-            folders = response.get('files', [])
             tree = {}
-            
-            # Base case for recursion
-            if depth is not None and depth <= 0:
-                return tree
-                
-            for folder in folders:
-                new_depth = None if depth is None else depth - 1
-                tree[folder['name']] = self.get_folder_tree(folder['id'], new_depth)
-                
-            return tree
+            subtrees = {folder_id: tree}
+            for parent_id, folder in self._walk_folders([folder_id], depth):
+                subtree = {}
+                subtrees[parent_id][folder['name']] = subtree
+                subtrees[folder['id']] = subtree
+            self._cache_put(key, tree, subtrees)
+            return copy.deepcopy(tree)
             
         except HttpError as error:
             print_color(f"Error retrieving folder structure: {str(error)}", color="red")
             return {}
 
     def list_all_folders(self):
-        """List all accessible folders in Drive"""
+        """List all accessible folders in Drive, as copies the caller may modify"""
+        folders = self._cache_get(('all',))
+        if folders is not None:
+            return [dict(folder) for folder in folders]
         try:
-            query = "mimeType='application/vnd.google-apps.folder' and trashed=false"
-            response = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
-            return response.get('files', [])
+            query = f"mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+            folders = []
+            page_token = None
+            while True:
+                response = self.service.files().list(
+                    q=query,
+                    spaces='drive',
+                    fields='nextPageToken, files(id, name)',
+                    pageSize=LIST_PAGE_SIZE,
+                    pageToken=page_token
+                ).execute()
+                folders.extend(response.get('files', []))
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+            self._cache_put(('all',), folders, (folder['id'] for folder in folders))
+            return [dict(folder) for folder in folders]
         except Exception as e:
             print_color(f"Error listing folders: {str(e)}", color="red")
             return []
\ No newline at end of file
@@ -1,13 +1,28 @@
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from delepwn.utils.output import print_color
-from delepwn.utils.api import handle_api_ratelimit
+from delepwn.utils.dates import parse_date
+from delepwn.utils.api import handle_api_ratelimit, execute_batch, build_service
 import csv
 import sys
 import base64
 import html
-from io import StringIO
-from datetime import datetime, timezone
+import re
+
+# Gmail throttles batches of more than 50 sub-requests
+GMAIL_BATCH_SIZE = 50
+# Largest page messages.list returns
+GMAIL_LIST_PAGE_SIZE = 500
+
+# Formatting artifacts rewritten by clean_text_for_csv, whitespace runs become a single space
+_CSV_SUBSTITUTIONS = {
+    '[image:': '[',
+    '⌐': '©',
+    '<https://': '<',
+    '>': '',
+    '«': "'",
+    'Æ': "'",
+}
+_CSV_CLEANUP_RE = re.compile(r'\s+|\[image:|<https://|[⌐>«Æ]')
 
 class GmailManager:
     """Manage Gmail operations including listing and reading emails"""
@@ -27,6 +42,7 @@ class GmailManager:
         ]
         self.service = None
         self.current_user = None
+        self._base_credentials = None
 
     def initialize_service(self, impersonate_email):
         """Initialize the Gmail service with impersonation
@@ -37,13 +53,15 @@ class GmailManager:
         if not impersonate_email:
             raise ValueError("Impersonation email is required")
             
-        credentials = service_account.Credentials.from_service_account_file(
-            self.SERVICE_ACCOUNT_FILE,
-            scopes=self.SCOPES,
-            subject=impersonate_email
-        )
+        # Parse the key file once, then derive per-user credentials from it
+        if self._base_credentials is None:
+            self._base_credentials = service_account.Credentials.from_service_account_file(
+                self.SERVICE_ACCOUNT_FILE,
+                scopes=self.SCOPES
+            )
+        credentials = self._base_credentials.with_subject(impersonate_email)
         
-        self.service = build('gmail', 'v1', credentials=credentials)
+        self.service = build_service('gmail', 'v1', credentials=credentials)
         self.current_user = impersonate_email
 
     def clean_text_for_csv(self, text):
@@ -58,22 +76,10 @@ class GmailManager:
         if not text:
             return ''
             
-        # Replace various newline formats
-        text = text.replace('\r\n', ' ').replace('\n', ' ').replace('\r', ' ')
-        
-        # Replace multiple spaces with single space
-        text = ' '.join(text.split())
-        
-        # Clean up common email formatting artifacts
-        text = text.replace('[image:', '[').replace('⌐', '©')
-        
-        # Remove URLs
-        text = text.replace('<https://', '<').replace('>', '')
-        
-        # Fix common encoding issues
-        text = text.replace('«', "'").replace('Æ', "'")
-        
-        return text
+        # Squeeze whitespace, strip URL brackets and fix encoding artifacts in a single pass
+        return _CSV_CLEANUP_RE.sub(
+            lambda match: _CSV_SUBSTITUTIONS.get(match.group(), ' '), text
+        ).strip()
 
     def get_message_body(self, msg):
         """Extract the message body from the email and clean it for CSV
@@ -87,22 +93,26 @@ class GmailManager:
         if 'payload' not in msg:
             return ''
 
-        text = ''
-        # Handle multipart messages
-        if 'parts' in msg['payload']:
-            for part in msg['payload']['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        text = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                        break
-            # If no text/plain found, try the first part
-            if not text and 'body' in msg['payload']['parts'][0]:
-                if 'data' in msg['payload']['parts'][0]['body']:
-                    text = base64.urlsafe_b64decode(msg['payload']['parts'][0]['body']['data']).decode('utf-8')
-        # Handle single part messages
-        elif 'body' in msg['payload']:
-            if 'data' in msg['payload']['body']:
-                text = base64.urlsafe_b64decode(msg['payload']['body']['data']).decode('utf-8')
+        # Walk the MIME tree in document order, nested multiparts included, and stop at
+        # the first text/plain part. Other text parts (e.g. text/html) are the fallback,
+        # attachments are never decoded.
+        data = None
+        fallback = None
+        stack = [msg['payload']]
+        while stack:
+            part = stack.pop()
+            part_data = part.get('body', {}).get('data')
+            mime_type = part.get('mimeType', '')
+            if part_data:
+                if mime_type == 'text/plain':
+                    data = part_data
+                    break
+                if fallback is None and mime_type.startswith('text/'):
+                    fallback = part_data
+            stack.extend(reversed(part.get('parts', [])))
+
+        data = data or fallback
+        text = base64.urlsafe_b64decode(data).decode('utf-8') if data else ''
         
         if text:
             # Clean and format the text for CSV
@@ -111,31 +121,39 @@ class GmailManager:
         
         return ''
 
-    def check_keywords_in_message(self, msg, keyword):
+    @staticmethod
+    def _headers_dict(msg):
+        """Map lowercased header names to their values in a single pass over the headers
+        
+        Repeated headers keep their first value, as the previous linear lookups did.
+        """
+        return {h['name'].lower(): h['value'] for h in reversed(msg.get('payload', {}).get('headers', []))}
+
+    def check_keywords_in_message(self, msg, keyword, body=None, headers=None):
         """Check if keyword appears exactly in any message field
         
         Args:
             msg (dict): Message object from Gmail API
             keyword (str): Exact phrase to search for
+            body (str, optional): Already extracted message body, decoded from msg when omitted
+            headers (dict, optional): Result of _headers_dict(msg), built from msg when omitted
             
         Returns:
             bool: True if exact phrase is found in any field
         """
         # Get each field separately
-        headers = msg['payload']['headers']
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-        sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
-        to = next((h['value'] for h in headers if h['name'] == 'To'), '')
-        body = self.get_message_body(msg)
-        
+        if headers is None:
+            headers = self._headers_dict(msg)
         # Check each field individually for exact phrase (case insensitive)
         keyword = keyword.lower()
-        return (
-            keyword in subject.lower() or
-            keyword in sender.lower() or
-            keyword in to.lower() or
-            keyword in body.lower()
-        )
+        for name in ('subject', 'from', 'to'):
+            if keyword in headers.get(name, '').lower():
+                return True
+
+        # The body is only decoded when no header matched
+        if body is None:
+            body = self.get_message_body(msg)
+        return keyword in body.lower()
 
     def get_attachments(self, msg):
         """Extract attachment names from the message
@@ -162,7 +180,83 @@ class GmailManager:
 
         return '; '.join(attachments)
 
+    def get_messages(self, message_ids, format='full'):
+        """Fetch messages through batched requests
+        
+        Args:
+            message_ids (list): IDs of the messages to fetch
+            format (str, optional): Gmail message format. Defaults to 'full'
+            
+        Rate-limited sub-requests are retried by execute_batch. Errors go to stderr so
+        they never interleave with CSV rows written to stdout.
+        
+        Returns:
+            dict: Message objects keyed by ID, messages that failed to load are left out
+        """
+        fetched = {}
+
+        def on_message(request_id, response, exception):
+            if exception is not None:
+                print_color(f"Error fetching message {request_id}: {str(exception)}", color="red", file=sys.stderr)
+            else:
+                fetched[request_id] = response
+
+        messages = self.service.users().messages()
+        requests = (
+            (message_id, messages.get(userId='me', id=message_id, format=format))
+            for message_id in dict.fromkeys(message_ids)
+        )
+        execute_batch(self.service, requests, on_message, batch_size=GMAIL_BATCH_SIZE)
+        return fetched
+
+    @staticmethod
+    def _build_query(start_date=None, end_date=None):
+        """Translate YYYY-MM-DD bounds into a Gmail search query
+        
+        Returns:
+            str: The query, empty when no bound is given
+            
+        Raises:
+            ValueError: If a date is not in YYYY-MM-DD format
+        """
+        query = []
+        for operator, value, label in (('after', start_date, 'start'), ('before', end_date, 'end')):
+            if value:
+                try:
+                    date = parse_date(value)
+                except ValueError:
+                    raise ValueError(f"Invalid {label} date format. Use YYYY-MM-DD") from None
+                query.append(f'{operator}:{date.strftime("%Y/%m/%d")}')
+        return ' '.join(query)
+
     @handle_api_ratelimit
+    def _fetch_page(self, request):
+        """Execute a single page request, retried on its own when rate limited"""
+        return request.execute()
+
+    def list_message_ids(self, max_results=100, query=''):
+        """Return up to max_results message stubs matching query, following nextPageToken
+        
+        Args:
+            max_results (int, optional): Maximum number of messages. Defaults to 100
+            query (str, optional): Gmail search query, not sent when empty
+            
+        Returns:
+            list: Message stubs with 'id' and 'threadId'
+        """
+        params = {'userId': 'me', 'maxResults': min(max_results, GMAIL_LIST_PAGE_SIZE)}
+        if query:
+            params['q'] = query
+
+        messages = []
+        message_list = self.service.users().messages()
+        request = message_list.list(**params)
+        while request is not None and len(messages) < max_results:
+            response = self._fetch_page(request)
+            messages.extend(response.get('messages', []))
+            request = message_list.list_next(request, response)
+        return messages[:max_results]
+
     def list_messages(self, max_results=100, start_date=None, end_date=None, keyword=None):
         """List emails in the user's inbox in CSV format"""
         if not self.service:
@@ -170,70 +264,55 @@ class GmailManager:
 
         try:
             # Build query for date filtering
-            query = []
-            if start_date:
-                try:
-                    date = datetime.strptime(start_date, '%Y-%m-%d')
-                    query.append(f'after:{date.strftime("%Y/%m/%d")}')
-                except ValueError:
-                    print_color("Invalid start date format. Use YYYY-MM-DD", color="red")
-                    return
-
-            if end_date:
-                try:
-                    date = datetime.strptime(end_date, '%Y-%m-%d')
-                    query.append(f'before:{date.strftime("%Y/%m/%d")}')
-                except ValueError:
-                    print_color("Invalid end date format. Use YYYY-MM-DD", color="red")
-                    return
+            try:
+                query = self._build_query(start_date, end_date)
+            except ValueError as e:
+                print_color(str(e), color="red")
+                return
 
             # Get messages
-            results = self.service.users().messages().list(
-                userId='me',
-                maxResults=max_results,
-                q=' '.join(query)
-            ).execute()
-            
-            messages = results.get('messages', [])
+            messages = self.list_message_ids(max_results, query)
             
             if not messages:
                 print_color("No messages found.", color="yellow")
                 return
             
-            # Create a string buffer
-            output = StringIO()
-            writer = csv.writer(output, lineterminator='')
+            # Rows go straight to stdout
+            writer = csv.writer(sys.stdout, lineterminator='\n')
             
             # Write header with To field and attachments
             writer.writerow(['From', 'To', 'Subject', 'Date', 'Message ID', 'Body', 'Attachments'])
-            print(output.getvalue(), end='\n')
-            output.seek(0)
-            output.truncate(0)
             
-            for message in messages:
-                # Get full message content
-                msg = self.service.users().messages().get(
-                    userId='me',
-                    id=message['id'],
-                    format='full'
-                ).execute()
-                
-                if keyword and not self.check_keywords_in_message(msg, keyword):
-                    continue
-
-                headers = msg['payload']['headers']
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
-                recipient = next((h['value'] for h in headers if h['name'] == 'To'), 'No Recipient')
-                date = next((h['value'] for h in headers if h['name'] == 'Date'), 'No Date')
-                body = self.get_message_body(msg)
-                attachments = self.get_attachments(msg)
-                
-                # Write message data with To field and attachments
-                writer.writerow([sender, recipient, subject, date, message['id'], body, attachments])
-                print(output.getvalue(), end='\n')
-                output.seek(0)
-                output.truncate(0)
+            # Fetch and write one batch at a time so only GMAIL_BATCH_SIZE full messages are held in memory
+            missing = 0
+            for start in range(0, len(messages), GMAIL_BATCH_SIZE):
+                chunk = messages[start:start + GMAIL_BATCH_SIZE]
+                fetched = self.get_messages([message['id'] for message in chunk])
+                missing += len({message['id'] for message in chunk} - fetched.keys())
+
+                for message in chunk:
+                    msg = fetched.get(message['id'])
+                    if msg is None:
+                        continue
+                    
+                    # Decode the body and index the headers once, both are needed for the keyword check and the row
+                    body = self.get_message_body(msg)
+                    headers = self._headers_dict(msg)
+                    if keyword and not self.check_keywords_in_message(msg, keyword, body, headers):
+                        continue
+
+                    subject = headers.get('subject', 'No Subject')
+                    sender = headers.get('from', 'Unknown Sender')
+                    recipient = headers.get('to', 'No Recipient')
+                    date = headers.get('date', 'No Date')
+                    attachments = self.get_attachments(msg)
+                    
+                    # Write message data with To field and attachments
+                    writer.writerow([sender, recipient, subject, date, message['id'], body, attachments])
+
+            if missing:
+                print_color(f"{missing} messages could not be fetched and are missing from the output",
+                            color="red", file=sys.stderr)
 
         except Exception as e:
             print_color(f"Error listing messages: {str(e)}", color="red")
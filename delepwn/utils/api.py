@@ -1,23 +1,225 @@
+import sys
+import json
 import time
+import random
 import logging
+import threading
+import functools
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 from delepwn.utils.output import print_color
+from delepwn.config.settings import (
+    DEFAULT_REQUEST_TIMEOUT, MAX_API_RETRIES, RATE_LIMIT_BACKOFF_FACTOR,
+    RATE_LIMIT_REASONS, API_RATE_LIMIT_QPS
+)
+
+try:
+    import orjson
+except ImportError:  # optional, responses are then parsed with the stdlib json module
+    orjson = None
+
+# httplib2.Http is not thread-safe, so connections are pooled per thread
+_thread_local = threading.local()
+
+class RateLimitExceeded(HttpError):
+    """Raised by handle_api_ratelimit once every retry of a throttled call was used"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting how many calls start per second"""
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.refill_rate
+            time.sleep(wait)
+
+
+# Shared by every rate-limited call so concurrent workers stay under the quota together
+_rate_limiter = TokenBucket(capacity=API_RATE_LIMIT_QPS, refill_rate=API_RATE_LIMIT_QPS)
+
+
+def _is_rate_limited(error):
+    """Return True for 429 responses and 403 responses carrying a quota reason
+    
+    RateLimitExceeded means an inner retry loop already gave up, it is not retried again.
+    """
+    if isinstance(error, RateLimitExceeded):
+        return False
+    if error.resp.status == 429:
+        return True
+    if error.resp.status != 403:
+        return False
+    try:
+        content = error.content.decode('utf-8') if isinstance(error.content, bytes) else error.content
+        details = json.loads(content).get('error', {}).get('errors', [])
+    except (ValueError, AttributeError):
+        return False
+    return any(detail.get('reason') in RATE_LIMIT_REASONS for detail in details)
+
+
+def _retry_after(error):
+    """Seconds requested by the Retry-After header, None when absent or not in seconds"""
+    value = error.resp.get('retry-after')
+    if value is not None and value.strip().isdigit():
+        return int(value)
+    return None
+
 
 def handle_api_ratelimit(func):
-    """Decorator to handle API rate limiting with exponential backoff"""
+    """Decorator to pace API calls and retry rate-limited ones
+    
+    Each call first takes a token from the shared bucket. Throttled calls are retried
+    after the server's Retry-After delay, or exponential backoff, plus random jitter so
+    concurrent workers do not retry in lockstep. RateLimitExceeded is raised once the
+    retries are exhausted.
+    """
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        max_retries = 5
-        backoff_factor = 2
-        for attempt in range(max_retries):
+        last_error = None
+        for attempt in range(MAX_API_RETRIES):
+            _rate_limiter.acquire()
             try:
                 return func(*args, **kwargs)
             except HttpError as e:
-                if e.resp.status == 429:
-                    sleep_time = backoff_factor ** (attempt + 1)
-                    print_color(f"API rate limit exceeded. Retrying in {sleep_time} seconds...", color="yellow")
-                    time.sleep(sleep_time)
-                else:
+                if not _is_rate_limited(e):
                     raise
+                last_error = e
+                if attempt == MAX_API_RETRIES - 1:
+                    break
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = RATE_LIMIT_BACKOFF_FACTOR ** (attempt + 1)
+                sleep_time = delay + random.uniform(0, 0.5 * delay)
+                print_color(f"API rate limit exceeded. Retrying in {sleep_time:.1f} seconds...", color="yellow")
+                time.sleep(sleep_time)
         print_color("Max retries exceeded for API rate limiting", color="red")
-        raise
-    return wrapper 
\ No newline at end of file
+        raise RateLimitExceeded(last_error.resp, last_error.content, uri=last_error.uri) from last_error
+    return wrapper
+
+def get_http():
+    """Return the httplib2.Http shared by all services on the current thread
+    
+    Reusing one connection object keeps TLS sessions alive across requests
+    and impersonated users instead of reconnecting for every service.
+    """
+    http = getattr(_thread_local, 'http', None)
+    if http is None:
+        http = _thread_local.http = httplib2.Http(timeout=DEFAULT_REQUEST_TIMEOUT)
+    return http
+
+
+def authorized_http(credentials):
+    """Wrap the current thread's shared connection with the given credentials"""
+    return AuthorizedHttp(credentials, http=get_http())
+
+
+class FastJsonModel(JsonModel):
+    """JsonModel that decodes API responses with orjson"""
+
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+            body = body['data']
+        return body
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document(service_name, version):
+    """Read the discovery document bundled with googleapiclient once per process"""
+    return discovery_cache.get_static_doc(service_name, version)
+
+
+def build_service(service_name, version, http=None, credentials=None):
+    """Build an API resource from the in-memory discovery document
+    
+    Args:
+        service_name (str): API name, e.g. 'calendar'
+        version (str): API version, e.g. 'v3'
+        http: Authorized HTTP object to use for requests
+        credentials: Credentials to use when no http object is given
+        
+    Returns:
+        Resource: API resource
+    """
+    model = FastJsonModel() if orjson is not None else None
+    document = _discovery_document(service_name, version)
+    if document is None:
+        return build(service_name, version, http=http, credentials=credentials, model=model)
+    return build_from_document(document, http=http, credentials=credentials, model=model)
+
+
+def execute_batch(service, requests, callback, batch_size=100):
+    """Execute API requests through BatchHttpRequest, at most batch_size per HTTP call
+
+    Sub-requests rejected by rate limiting are sent again in a new batch after a
+    jittered backoff, up to MAX_API_RETRIES times; callback only sees their final outcome.
+
+    Args:
+        service: API resource the requests were built from
+        requests: Iterable of (request_id, HttpRequest) tuples, request IDs must be unique
+        callback: Called as callback(request_id, response, exception) for each sub-request
+        batch_size (int): Maximum number of sub-requests per batch
+    """
+    chunk = []
+    for item in requests:
+        chunk.append(item)
+        if len(chunk) == batch_size:
+            _execute_batch_chunk(service, chunk, callback)
+            chunk = []
+    if chunk:
+        _execute_batch_chunk(service, chunk, callback)
+
+
+def _execute_batch_chunk(service, chunk, callback):
+    """Execute one batch, retrying the sub-requests that were rate limited"""
+    pending = dict(chunk)
+    for attempt in range(MAX_API_RETRIES):
+        last_attempt = attempt == MAX_API_RETRIES - 1
+        throttled = {}
+
+        def on_response(request_id, response, exception):
+            if isinstance(exception, HttpError) and _is_rate_limited(exception):
+                if not last_attempt:
+                    throttled[request_id] = exception
+                    return
+                exception = RateLimitExceeded(exception.resp, exception.content, uri=exception.uri)
+            callback(request_id, response, exception)
+
+        batch = service.new_batch_http_request(callback=on_response)
+        for request_id, request in pending.items():
+            batch.add(request, request_id=request_id)
+        _rate_limiter.acquire()
+        batch.execute()
+        if not throttled:
+            return
+
+        delay = max((_retry_after(error) or 0) for error in throttled.values())
+        if not delay:
+            delay = RATE_LIMIT_BACKOFF_FACTOR ** (attempt + 1)
+        sleep_time = delay + random.uniform(0, 0.5 * delay)
+        print_color(f"{len(throttled)} batched requests rate limited. Retrying in {sleep_time:.1f} seconds...",
+                    color="yellow", file=sys.stderr)
+        time.sleep(sleep_time)
+        pending = {request_id: pending[request_id] for request_id in throttled}
@@ -0,0 +1,22 @@
+import re
+from datetime import datetime
+
+# Command line dates are plain calendar days, no time or UTC offset
+_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD command line date
+    
+    Args:
+        value (str): Date in YYYY-MM-DD format
+        
+    Returns:
+        datetime: Naive datetime at midnight of that day
+        
+    Raises:
+        ValueError: If value is not a valid YYYY-MM-DD date
+    """
+    if not _DATE_PATTERN.fullmatch(value):
+        raise ValueError(f"Invalid date {value!r}, use YYYY-MM-DD")
+    return datetime.fromisoformat(value)
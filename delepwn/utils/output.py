@@ -66,7 +66,22 @@ def color_text(text, color=None, background=None, style=None):
     style_code = STYLES.get(style.lower(), '') if style else ''
     return f"{style_code}{color_code}{bg_code}{text}{Style.RESET_ALL}"
 
-def print_color(text, color=None, background=None, style=None):
+def colorizer(color=None, background=None, style=None):
+    """
+    Returns a function that wraps text in the specified color, for bulk output loops.
+
+    The escape sequences are looked up once instead of on every call.
+
+    :param color: The color name as a string.
+    :param background: The background color name as a string.
+    :param style: The text style as a string.
+    :return: Function taking the text and returning the colored text string.
+    """
+    prefix = color_text('', color, background, style)[:-len(Style.RESET_ALL)]
+    reset = Style.RESET_ALL
+    return lambda text: f"{prefix}{text}{reset}"
+
+def print_color(text, color=None, background=None, style=None, file=None):
     """
     Prints the text in the specified color.
 
@@ -74,5 +89,6 @@ def print_color(text, color=None, background=None, style=None):
     :param color: The color name as a string.
     :param background: The background color name as a string.
     :param style: The text style as a string.
+    :param file: Stream to print to, defaults to stdout.
     """
-    print(color_text(text, color, background, style))
+    print(color_text(text, color, background, style), file=file)